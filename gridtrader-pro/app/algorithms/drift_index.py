@@ -0,0 +1,150 @@
+from typing import List, Dict, Tuple
+import numpy as np
+
+from .rebalance_batch import BatchRebalancer
+
+# Relative safety margin on move tolerances against floating-point error at the band edge
+_TOLERANCE_MARGIN = 1e-9
+
+def move_tolerances(rebalancer: BatchRebalancer, known: np.ndarray) -> np.ndarray:
+    """Per portfolio, the largest relative move δ every priced holding can make at once with all
+    targeted weights staying inside their bands.
+
+    ``known`` masks the symbols with a reference price; the others are held
+    constant, like the untracked remainder of the total value. A holding's
+    weight is worst off when it moves by δ one way and every other priced
+    holding by δ the other way, which bounds δ in closed form per targeted
+    cell. Portfolios already outside a band (or with short or no value)
+    get 0, so any move makes them candidates.
+    """
+    rb = rebalancer
+    num_portfolios = len(rb.portfolio_ids)
+    values, totals = rb.positions, rb.total_values[rb.rows]
+    targeted = ~np.isnan(rb.target_weights)
+    upper = (rb.target_weights + rb.bands) / 100
+    lower = (rb.target_weights - rb.bands) / 100
+    
+    moving = np.where(known[rb.cols], values, 0.0)
+    rest = np.bincount(rb.rows, weights=moving, minlength=num_portfolios)[rb.rows] - moving
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # v(1+δ) <= u (T + vδ - Rδ) and v(1-δ) >= l (T - vδ + Rδ), with R the other moving value
+        upper_room = np.where(
+            targeted & (upper < 1),
+            (upper * totals - values) / (moving * (1 - upper) + upper * rest),
+            np.inf
+        )
+        lower_room = np.where(
+            targeted & (lower > 0),
+            (values - lower * totals) / (moving * (1 - lower) + lower * rest),
+            np.inf
+        )
+    
+    rooms = np.fmin(upper_room, lower_room)
+    # 0/0 only arises where nothing moves the weight; a negative room means already outside
+    rooms = np.where(np.isnan(rooms), np.inf, rooms)
+    tolerances = np.full(num_portfolios, np.inf)
+    np.minimum.at(tolerances, rb.rows, rooms)
+    tolerances = np.maximum(tolerances, 0.0) * (1 - _TOLERANCE_MARGIN)
+    
+    invalid = (rb.total_values <= 0) | (np.bincount(rb.rows, weights=values < 0, minlength=num_portfolios) > 0)
+    return np.where(invalid, 0.0, tolerances)
+
+class DriftIndex:
+    """Per-symbol sorted index of the prices at which portfolios may leave their rebalance bands.
+
+    Each portfolio gets a uniform move tolerance δ (see ``move_tolerances``):
+    while every priced holding stays within ``reference * (1 ± δ)``, no
+    targeted weight can leave its band, whichever way the holdings move
+    together. The index holds those two thresholds per held (portfolio,
+    symbol) cell. A batch of price updates looks up the crossed thresholds;
+    portfolios with any holding outside its box stay candidates on later
+    updates until it moves back. Candidates are re-checked exactly, so
+    ``update`` reports every portfolio outside its bands at the latest
+    prices, with no false positives. Rebuild the index after rebalancing
+    and periodically so the boxes are re-centred on current prices.
+    """
+    
+    def __init__(self, rebalancer: BatchRebalancer, prices: Dict[str, float]):
+        self.rebalancer = rebalancer
+        self.symbols = rebalancer.symbols
+        self._col_of = {s: j for j, s in enumerate(self.symbols)}
+        self.reference_prices = np.array([float(prices[s]) if prices.get(s) is not None else np.nan
+                                          for s in self.symbols], dtype=float)
+        self.prices = self.reference_prices.copy()
+        self._build()
+    
+    def _build(self):
+        rb = self.rebalancer
+        known = ~np.isnan(self.reference_prices)
+        self.tolerances = move_tolerances(rb, known)
+        
+        # Per cell of the rebalancer
+        self._held = (rb.positions != 0) & known[rb.cols] & np.isfinite(self.tolerances[rb.rows])
+        ref = self.reference_prices[rb.cols]
+        delta = self.tolerances[rb.rows]
+        self._upper = self._index(ref * (1 + delta), self._held)
+        self._lower = self._index(ref * (1 - delta), self._held)
+        # Portfolios with a holding outside its box, or already outside a band (zero tolerance)
+        self._outside = self.tolerances <= 0
+    
+    def _index(self, thresholds: np.ndarray, valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(sorted prices, portfolio rows, per-symbol offsets) grouped by symbol"""
+        rows, cols = self.rebalancer.rows[valid], self.rebalancer.cols[valid]
+        prices = thresholds[valid]
+        order = np.lexsort((prices, cols))
+        offsets = np.searchsorted(cols[order], np.arange(len(self.symbols) + 1))
+        return prices[order], rows[order], offsets
+    
+    def candidates(self, prices: Dict[str, float]) -> np.ndarray:
+        """Portfolio rows whose box any updated symbol's price lies outside"""
+        hits = []
+        for symbol, price in prices.items():
+            col = self._col_of.get(symbol)
+            if col is None or price is None:
+                continue
+            price = float(price)
+            
+            upper_prices, upper_rows, upper_offsets = self._upper
+            start, stop = upper_offsets[col], upper_offsets[col + 1]
+            # Outside above the upper threshold, below the lower one
+            hits.append(upper_rows[start:start + np.searchsorted(upper_prices[start:stop], price, side='left')])
+            
+            lower_prices, lower_rows, lower_offsets = self._lower
+            start, stop = lower_offsets[col], lower_offsets[col + 1]
+            hits.append(lower_rows[start + np.searchsorted(lower_prices[start:stop], price, side='right'):stop])
+        
+        return np.unique(np.concatenate(hits)) if hits else np.zeros(0, dtype=np.intp)
+    
+    def update(self, prices: Dict[str, float]) -> List[str]:
+        """Apply a batch of price updates and return ids of the portfolios now outside their bands.
+
+        Exact for any combination of moves since the last build: portfolios
+        crossed by this batch are checked together with those still outside
+        their box from earlier batches.
+        """
+        for symbol, price in prices.items():
+            col = self._col_of.get(symbol)
+            if col is not None and price is not None:
+                self.prices[col] = float(price)
+        
+        rows = np.union1d(self.candidates(prices), np.flatnonzero(self._outside))
+        if not len(rows):
+            return []
+        
+        rb = self.rebalancer
+        ratio = np.where(np.isnan(self.reference_prices), 1.0, self.prices / self.reference_prices)
+        cells = rb.cell_indices(rows)
+        cell_rows, cell_cols = rb.rows[cells], rb.cols[cells]
+        
+        # Rows whose holdings have all moved back inside their box drop out of later checks
+        moved = self._held[cells] & (np.abs(ratio[cell_cols] - 1) > self.tolerances[cell_rows])
+        self._outside[rows] = self.tolerances[rows] <= 0
+        self._outside[cell_rows[moved]] = True
+        
+        values = rb.positions[cells] * ratio[cell_cols]
+        changes = np.bincount(cell_rows, weights=values - rb.positions[cells], minlength=len(self._outside))
+        totals = rb.total_values[rows] + changes[rows]
+        
+        result = rb.subset(rows, values, totals).calculate()
+        return [pid for pid, flag in zip(result.portfolio_ids, result.needs_rebalancing.tolist()) if flag]
@@ -0,0 +1,196 @@
+from typing import Dict, Any, Optional, Tuple
+from dataclasses import dataclass
+import numpy as np
+
+from .grid_trading import GridConfig, GridTradingEngine, ACTION_CODES, POINTS_PER_BAR, bar_path
+
+@dataclass
+class OHLCSeries:
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+    def __len__(self):
+        return len(self.close)
+
+    def slice(self, start: int, stop: int) -> 'OHLCSeries':
+        """Zero-copy view over bars ``start:stop``"""
+        return OHLCSeries(
+            dates=self.dates[start:stop],
+            open=self.open[start:stop],
+            high=self.high[start:stop],
+            low=self.low[start:stop],
+            close=self.close[start:stop]
+        )
+
+@dataclass
+class GridBacktestResult:
+    level_numbers: np.ndarray  # one entry per grid level (lot)
+    cycle_counts: np.ndarray  # completed buy/sell round trips per level
+    fill_bars: np.ndarray  # bar index of each fill, in time order
+    fill_levels: np.ndarray
+    fill_actions: np.ndarray  # ACTION_CODES values
+    fill_prices: np.ndarray
+    fill_quantities: np.ndarray
+    cash: np.ndarray  # end-of-bar paths
+    position: np.ndarray
+    equity: np.ndarray
+    realized_pnl: np.ndarray
+    unrealized_pnl: np.ndarray
+    initial_equity: float
+
+    def summary(self) -> Dict[str, Any]:
+        if len(self.equity) == 0:
+            return {'bars': 0, 'total_fills': 0}
+        
+        running_max = np.maximum.accumulate(self.equity)
+        # A grid with nothing to fill has zero equity throughout: no drawdown rather than 0/0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = np.where(running_max > 0, (running_max - self.equity) / running_max, 0.0)
+        
+        return {
+            'bars': len(self.equity),
+            'total_fills': len(self.fill_bars),
+            'buy_fills': int(np.count_nonzero(self.fill_actions == ACTION_CODES['BUY'])),
+            'sell_fills': int(np.count_nonzero(self.fill_actions == ACTION_CODES['SELL'])),
+            'completed_cycles': int(self.cycle_counts.sum()),
+            'final_cash': float(self.cash[-1]),
+            'final_position': float(self.position[-1]),
+            'final_equity': float(self.equity[-1]),
+            'realized_pnl': float(self.realized_pnl[-1]),
+            'unrealized_pnl': float(self.unrealized_pnl[-1]),
+            'total_return_pct': float((self.equity[-1] / self.initial_equity - 1) * 100) if self.initial_equity > 0 else 0,
+            'max_drawdown_pct': float(drawdown.max() * 100),
+            'cycles_by_level': dict(zip(self.level_numbers.tolist(), self.cycle_counts.tolist()))
+        }
+
+def grid_lots(config: GridConfig) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Pair every grid level with its neighbour one step away.
+
+    Each level is modelled as one lot that buys at ``buy_price`` and sells at
+    ``sell_price``. BUY levels sell at the next level up (the base price for
+    level -1); SELL levels rebuy at the next level down. SELL-side lots start
+    out held, as inventory bought at the base price.
+
+    Returns (level_numbers, buy_prices, sell_prices, starts_held).
+    """
+    # Levels at or below zero can never fill
+    levels = [l for l in GridTradingEngine(config).levels if l.trigger_price > 0]
+    ladder = np.unique(np.array([l.trigger_price for l in levels] + [config.base_price], dtype=float))
+    
+    level_numbers = np.array([l.level_number for l in levels], dtype=np.int32)
+    trigger_prices = np.array([l.trigger_price for l in levels], dtype=float)
+    is_buy = np.array([l.action == 'BUY' for l in levels], dtype=bool)
+    
+    pos = np.searchsorted(ladder, trigger_prices)
+    above = ladder[np.minimum(pos + 1, len(ladder) - 1)]
+    below = ladder[np.maximum(pos - 1, 0)]
+    
+    buy_prices = np.where(is_buy, trigger_prices, below)
+    sell_prices = np.where(is_buy, above, trigger_prices)
+    
+    return level_numbers, buy_prices, sell_prices, ~is_buy
+
+def lot_states(path: np.ndarray, buy_prices: np.ndarray, sell_prices: np.ndarray,
+               starts_held: np.ndarray) -> np.ndarray:
+    """Held/not-held state of every lot at every point of ``path``.
+
+    ``path`` is (..., points) including the starting point; lot arrays are
+    (levels,). Result has shape (..., levels, points). A down move reaching
+    the buy price makes a lot held, an up move reaching the sell price makes
+    it flat, and the most recent event wins.
+    """
+    path = path[..., None, :]
+    buy_prices = buy_prices[:, None]
+    sell_prices = sell_prices[:, None]
+    
+    step = np.diff(path, axis=-1)
+    bought = (step < 0) & (path[..., 1:] <= buy_prices)
+    sold = (step > 0) & (path[..., 1:] >= sell_prices)
+    
+    # Index of the most recent buy and sell event at each point; the first
+    # column stands in for the initial state. A lot is held when its last buy
+    # is more recent than its last sell.
+    shape = np.broadcast_shapes(path.shape[:-1], buy_prices.shape[:-1]) + (path.shape[-1],)
+    points = np.arange(1, shape[-1], dtype=np.int32)
+    
+    last_buy = np.empty(shape, dtype=np.int32)
+    last_buy[..., 0] = np.where(starts_held, 0, -1)
+    last_buy[..., 1:] = np.where(bought, points, -1)
+    np.maximum.accumulate(last_buy, axis=-1, out=last_buy)
+    
+    last_sell = np.empty(shape, dtype=np.int32)
+    last_sell[..., 0] = np.where(starts_held, -1, 0)
+    last_sell[..., 1:] = np.where(sold, points, -1)
+    np.maximum.accumulate(last_sell, axis=-1, out=last_sell)
+    
+    return last_buy > last_sell
+
+def backtest_grid(config: GridConfig, prices: OHLCSeries,
+                  initial_cash: Optional[float] = None) -> GridBacktestResult:
+    """Replay an OHLC series through the grid in one array computation.
+
+    ``position_size`` is treated as the cash value of one lot at its buy
+    price. Orders rest at level prices, so fills happen exactly at the level.
+    ``initial_cash`` defaults to enough cash to fill every BUY level.
+    """
+    level_numbers, buy_prices, sell_prices, starts_held = grid_lots(config)
+    units = config.position_size / buy_prices
+    num_bars = len(prices)
+    
+    if initial_cash is None:
+        initial_cash = float(config.position_size * np.count_nonzero(~starts_held))
+    initial_position = float(units[starts_held].sum())
+    initial_equity = initial_cash + initial_position * config.base_price
+    
+    path = np.concatenate(([config.base_price], bar_path(prices.open, prices.high, prices.low, prices.close)))
+    held = lot_states(path, buy_prices, sell_prices, starts_held)
+    
+    # Fills in time order (sub-step major, then level)
+    changed = held[:, 1:] != held[:, :-1]
+    step_idx, level_idx = np.nonzero(changed.T)
+    is_buy_fill = held[level_idx, step_idx + 1]
+    fill_bars = step_idx // POINTS_PER_BAR
+    fill_prices = np.where(is_buy_fill, buy_prices[level_idx], sell_prices[level_idx])
+    fill_units = units[level_idx]
+    
+    # Lots still holding their initial inventory carry the base price as cost
+    sell_levels = level_idx[~is_buy_fill]
+    _, first_pos = np.unique(sell_levels, return_index=True)
+    is_first_sell = np.zeros(len(step_idx), dtype=bool)
+    is_first_sell[np.flatnonzero(~is_buy_fill)[first_pos]] = True
+    lot_cost = np.where(is_first_sell & starts_held[level_idx], config.base_price, buy_prices[level_idx])
+    
+    signed_units = np.where(is_buy_fill, fill_units, -fill_units)
+    cash_flow = np.bincount(fill_bars, weights=-signed_units * fill_prices, minlength=num_bars)
+    position_flow = np.bincount(fill_bars, weights=signed_units, minlength=num_bars)
+    cost_flow = np.bincount(fill_bars, weights=signed_units * lot_cost, minlength=num_bars)
+    
+    cash = initial_cash + np.cumsum(cash_flow)
+    position = initial_position + np.cumsum(position_flow)
+    cost_basis = initial_position * config.base_price + np.cumsum(cost_flow)
+    close = np.asarray(prices.close, dtype=float)
+    equity = cash + position * close
+    unrealized = position * close - cost_basis
+    realized = equity - initial_equity - unrealized
+    
+    buy_counts = np.bincount(level_idx[is_buy_fill], minlength=len(level_numbers))
+    sell_counts = np.bincount(sell_levels, minlength=len(level_numbers))
+    
+    return GridBacktestResult(
+        level_numbers=level_numbers,
+        cycle_counts=np.minimum(buy_counts, sell_counts),
+        fill_bars=fill_bars,
+        fill_levels=level_numbers[level_idx],
+        fill_actions=np.where(is_buy_fill, ACTION_CODES['BUY'], ACTION_CODES['SELL']).astype(np.int8),
+        fill_prices=fill_prices,
+        fill_quantities=fill_units,
+        cash=cash,
+        position=position,
+        equity=equity,
+        realized_pnl=realized,
+        unrealized_pnl=unrealized,
+        initial_equity=initial_equity
+    )
@@ -0,0 +1,230 @@
+from typing import List, Dict, Iterable, Tuple
+import numpy as np
+
+from .grid_trading import (
+    GridAction, GridOrder, GridTradingEngine, LevelTransition, ACTION_CODES, ACTION_NAMES, coalesce_actions, to_ticks
+)
+
+# Re-arm ticks that no price can reach, for levels that never re-arm
+_NEVER_BUY = np.iinfo(np.int64).max
+_NEVER_SELL = np.iinfo(np.int64).min
+
+class BatchGridEvaluator:
+    """Evaluate triggers for many grids at once.
+
+    All grids are packed into one padded level matrix (one row per grid),
+    with rows grouped by symbol. A vector of current prices is broadcast
+    over the matrix and every crossed level is found in a single pass.
+    Trigger prices are held as int64 ticks, so comparisons are exact.
+    """
+    
+    def __init__(self):
+        self._pending: List[Tuple[str, str, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        self.grid_ids: List[str] = []
+        self.symbols: List[str] = []
+        self.symbol_slices: Dict[str, slice] = {}
+        self.level_numbers = np.zeros((0, 0), dtype=np.int32)
+        self.trigger_ticks = np.zeros((0, 0), dtype=np.int64)
+        self.action_codes = np.zeros((0, 0), dtype=np.int8)
+        self.allocations = np.zeros((0, 0), dtype=float)
+        self.is_filled = np.zeros((0, 0), dtype=bool)
+        self.rearm_ticks = np.zeros((0, 0), dtype=np.int64)
+        self._grid_symbol = np.zeros(0, dtype=np.intp)
+    
+    def add_levels(self, grid_id: str, symbol: str, level_numbers, trigger_prices,
+                   allocations, is_filled=None, action_codes=None, rearm_ticks=None):
+        """Queue one grid's levels; BUY/SELL is taken from the level sign unless given.
+
+        Levels without ``rearm_ticks`` never re-arm in ``transitions``.
+        """
+        level_numbers = np.asarray(level_numbers, dtype=np.int32)
+        if action_codes is None:
+            action_codes = np.where(level_numbers < 0, ACTION_CODES['BUY'], ACTION_CODES['SELL'])
+        if is_filled is None:
+            is_filled = np.zeros(len(level_numbers), dtype=bool)
+        if rearm_ticks is None:
+            rearm_ticks = np.where(np.asarray(action_codes) == ACTION_CODES['BUY'], _NEVER_BUY, _NEVER_SELL)
+        
+        self._pending.append((
+            str(grid_id),
+            symbol.upper(),
+            level_numbers,
+            to_ticks(trigger_prices),
+            np.asarray(action_codes, dtype=np.int8),
+            np.asarray(allocations, dtype=float),
+            np.asarray(is_filled, dtype=bool),
+            np.asarray(rearm_ticks, dtype=np.int64)
+        ))
+    
+    def add_engine(self, grid_id: str, engine: GridTradingEngine):
+        if engine.compact:
+            self.add_levels(
+                grid_id,
+                engine.config.symbol,
+                engine.level_numbers,
+                engine.trigger_prices,
+                engine.allocations,
+                is_filled=engine.filled.copy(),
+                action_codes=engine.action_codes,
+                rearm_ticks=engine.rearm_ticks
+            )
+            return
+        
+        levels = engine.levels
+        self.add_levels(
+            grid_id,
+            engine.config.symbol,
+            [l.level_number for l in levels],
+            [l.trigger_price for l in levels],
+            [l.target_allocation for l in levels],
+            is_filled=[l.is_filled for l in levels],
+            action_codes=[ACTION_CODES[l.action] for l in levels],
+            rearm_ticks=engine.rearm_ticks
+        )
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'BatchGridEvaluator':
+        """Build from ``(grid_id, symbol, level_number, trigger_price, allocation, is_filled)`` rows.
+
+        Rows must be grouped by grid id, as returned by a query ordered on it.
+        """
+        evaluator = cls()
+        current_id = None
+        symbol = None
+        numbers, prices, allocations, filled = [], [], [], []
+        
+        for grid_id, row_symbol, level_number, trigger_price, allocation, is_filled in rows:
+            if grid_id != current_id:
+                if current_id is not None:
+                    evaluator.add_levels(current_id, symbol, numbers, prices, allocations, filled)
+                current_id, symbol = grid_id, row_symbol
+                numbers, prices, allocations, filled = [], [], [], []
+            numbers.append(level_number)
+            prices.append(float(trigger_price))
+            allocations.append(float(allocation))
+            filled.append(bool(is_filled))
+        
+        if current_id is not None:
+            evaluator.add_levels(current_id, symbol, numbers, prices, allocations, filled)
+        
+        return evaluator.build()
+    
+    def build(self) -> 'BatchGridEvaluator':
+        """Pack queued grids into the level matrix, grouped by symbol"""
+        pending = sorted(self._pending, key=lambda g: g[1])
+        self._pending = []
+        
+        num_grids = len(pending)
+        max_levels = max((len(g[2]) for g in pending), default=0)
+        
+        self.grid_ids = [g[0] for g in pending]
+        self.level_numbers = np.zeros((num_grids, max_levels), dtype=np.int32)
+        self.trigger_ticks = np.zeros((num_grids, max_levels), dtype=np.int64)
+        self.action_codes = np.zeros((num_grids, max_levels), dtype=np.int8)
+        self.allocations = np.zeros((num_grids, max_levels), dtype=float)
+        # Padding cells are marked filled so they can never trigger
+        self.is_filled = np.ones((num_grids, max_levels), dtype=bool)
+        self.rearm_ticks = np.full((num_grids, max_levels), _NEVER_SELL)
+        
+        grid_symbols = [g[1] for g in pending]
+        self.symbols = sorted(set(grid_symbols))
+        symbol_pos = {s: i for i, s in enumerate(self.symbols)}
+        self._grid_symbol = np.array([symbol_pos[s] for s in grid_symbols], dtype=np.intp)
+        
+        self.symbol_slices = {}
+        for row, (grid_id, symbol, numbers, ticks, codes, allocations, filled, rearm) in enumerate(pending):
+            n = len(numbers)
+            self.level_numbers[row, :n] = numbers
+            self.trigger_ticks[row, :n] = ticks
+            self.action_codes[row, :n] = codes
+            self.allocations[row, :n] = allocations
+            self.is_filled[row, :n] = filled
+            self.rearm_ticks[row, :n] = rearm
+            
+            start = self.symbol_slices[symbol].start if symbol in self.symbol_slices else row
+            self.symbol_slices[symbol] = slice(start, row + 1)
+        
+        return self
+    
+    def price_vector(self, prices: Dict[str, float]) -> np.ndarray:
+        """Align a symbol -> price mapping with ``self.symbols``; missing symbols are NaN"""
+        return np.array([float(prices[s]) if prices.get(s) is not None else np.nan
+                         for s in self.symbols], dtype=float)
+    
+    def _grid_ticks(self, symbol_prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-grid price column in ticks, and a mask of grids whose price is known"""
+        symbol_prices = np.asarray(symbol_prices, dtype=float)
+        known = ~np.isnan(symbol_prices)
+        symbol_ticks = to_ticks(np.where(known, symbol_prices, 0.0))
+        return symbol_ticks[self._grid_symbol][:, None], known[self._grid_symbol][:, None]
+    
+    def crossed(self, symbol_prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (grid rows, level columns) of every crossed unfilled level.
+
+        ``symbol_prices`` is aligned with ``self.symbols``. NaN prices never trigger.
+        """
+        grid_ticks, known = self._grid_ticks(symbol_prices)
+        
+        buy_hit = (self.action_codes == ACTION_CODES['BUY']) & (grid_ticks <= self.trigger_ticks)
+        sell_hit = (self.action_codes == ACTION_CODES['SELL']) & (grid_ticks >= self.trigger_ticks)
+        
+        return np.nonzero((buy_hit | sell_hit) & ~self.is_filled & known)
+    
+    def evaluate(self, prices: Dict[str, float]) -> Dict[str, List[GridAction]]:
+        """Check every grid against the latest prices and return actions per grid id"""
+        symbol_prices = self.price_vector(prices)
+        rows, cols = self.crossed(symbol_prices)
+        
+        level_numbers = self.level_numbers[rows, cols]
+        codes = self.action_codes[rows, cols]
+        allocations = self.allocations[rows, cols]
+        fill_prices = symbol_prices[self._grid_symbol[rows]]
+        
+        actions: Dict[str, List[GridAction]] = {}
+        for row, level_number, code, allocation, price in zip(
+                rows.tolist(), level_numbers.tolist(), codes.tolist(),
+                allocations.tolist(), fill_prices.tolist()):
+            actions.setdefault(self.grid_ids[row], []).append(GridAction(
+                level_id=str(level_number),
+                action=ACTION_NAMES[code],
+                quantity=allocation,
+                price=price
+            ))
+        
+        return actions
+    
+    def transitions(self, prices: Dict[str, float]) -> Dict[str, List[LevelTransition]]:
+        """Advance every grid's level state machine and return only the transitions per grid id.
+
+        Crossed unfilled levels become filled and filled levels whose price
+        crossed back to their re-arm price become armed again; ``is_filled``
+        is updated in place, so repeating the same prices returns nothing.
+        """
+        symbol_prices = self.price_vector(prices)
+        grid_ticks, known = self._grid_ticks(symbol_prices)
+        
+        is_buy = self.action_codes == ACTION_CODES['BUY']
+        crossed_back = np.where(is_buy, grid_ticks >= self.rearm_ticks, grid_ticks <= self.rearm_ticks)
+        rearm = self.is_filled & crossed_back & known
+        fill = np.zeros_like(rearm)
+        fill[self.crossed(symbol_prices)] = True
+        
+        self.is_filled[rearm] = False
+        self.is_filled[fill] = True
+        
+        transitions: Dict[str, List[LevelTransition]] = {}
+        for state, mask in (('armed', rearm), ('filled', fill)):
+            rows, cols = np.nonzero(mask)
+            for row, level_number, code, allocation, price in zip(
+                    rows.tolist(), self.level_numbers[rows, cols].tolist(),
+                    self.action_codes[rows, cols].tolist(), self.allocations[rows, cols].tolist(),
+                    symbol_prices[self._grid_symbol[rows]].tolist()):
+                transitions.setdefault(self.grid_ids[row], []).append(LevelTransition(
+                    level_number, state, ACTION_NAMES[code], allocation, price
+                ))
+        
+        return transitions
+    
+    def evaluate_orders(self, prices: Dict[str, float]) -> Dict[str, List[GridOrder]]:
+        """Like evaluate, but with each grid's crossed levels merged into one order per side"""
+        return {grid_id: coalesce_actions(actions) for grid_id, actions in self.evaluate(prices).items()}
@@ -0,0 +1,138 @@
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import itertools
+import os
+import numpy as np
+
+from .grid_trading import GridConfig
+from .grid_backtest import OHLCSeries, backtest_grid
+
+# Largest parameter sweep a single request may run
+MAX_SWEEP_CONFIGS = 2000
+
+# Price arrays attached by each worker process
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_prices: Optional[OHLCSeries] = None
+
+class SharedPrices:
+    """OHLC arrays copied once into shared memory so workers can map them without pickling"""
+    
+    def __init__(self, prices: OHLCSeries):
+        matrix = np.stack([prices.open, prices.high, prices.low, prices.close]).astype(float)
+        self.shape = matrix.shape
+        self.shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+        np.ndarray(self.shape, dtype=float, buffer=self.shm.buf)[:] = matrix
+    
+    @property
+    def name(self) -> str:
+        return self.shm.name
+    
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+def attach_prices(shm_name: str, shape: Tuple[int, int]) -> Tuple[shared_memory.SharedMemory, OHLCSeries]:
+    """Map a ``SharedPrices`` block as zero-copy OHLC views"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    matrix = np.ndarray(shape, dtype=float, buffer=shm.buf)
+    prices = OHLCSeries(
+        dates=np.arange(shape[1]),
+        open=matrix[0],
+        high=matrix[1],
+        low=matrix[2],
+        close=matrix[3]
+    )
+    return shm, prices
+
+def worker_prices(shm_name: str, shape: Tuple[int, int]) -> OHLCSeries:
+    """Prices of a ``SharedPrices`` block in a worker, attached once and reused until another block arrives"""
+    global _worker_shm, _worker_prices
+    if _worker_shm is None or _worker_shm.name != shm_name:
+        if _worker_shm is not None:
+            _worker_prices = None
+            _worker_shm.close()
+        _worker_shm, _worker_prices = attach_prices(shm_name, shape)
+    return _worker_prices
+
+def _run_configs(configs: List[GridConfig], prices: OHLCSeries,
+                 initial_cash: Optional[float]) -> List[Dict[str, Any]]:
+    results = []
+    for config in configs:
+        summary = backtest_grid(config, prices, initial_cash).summary()
+        summary.pop('cycles_by_level', None)
+        results.append({
+            'grid_spacing': config.grid_spacing,
+            'num_grids_up': config.num_grids_up,
+            'num_grids_down': config.num_grids_down,
+            'position_size': config.position_size,
+            **summary
+        })
+    return results
+
+def _run_chunk(shm_name: str, shape: Tuple[int, int], configs: List[GridConfig],
+               initial_cash: Optional[float]) -> List[Dict[str, Any]]:
+    return _run_configs(configs, worker_prices(shm_name, shape), initial_cash)
+
+def parameter_grid(symbol: str, base_price: float, grid_spacings: Sequence[float],
+                   num_grids_up: Sequence[int], num_grids_down: Sequence[int],
+                   position_sizes: Sequence[float], grid_type: str = "percentage") -> List[GridConfig]:
+    """Cartesian product of the swept parameters as GridConfig objects"""
+    return [
+        GridConfig(
+            symbol=symbol,
+            base_price=base_price,
+            grid_spacing=spacing,
+            num_grids_up=up,
+            num_grids_down=down,
+            position_size=size,
+            grid_type=grid_type
+        )
+        for spacing, up, down, size in itertools.product(
+            grid_spacings, num_grids_up, num_grids_down, position_sizes
+        )
+    ]
+
+def sweep_grid_parameters(configs: List[GridConfig], prices: OHLCSeries,
+                          rank_by: str = 'total_return_pct', initial_cash: Optional[float] = None,
+                          max_workers: Optional[int] = None, chunk_size: int = 16,
+                          executor: Optional[Executor] = None) -> List[Dict[str, Any]]:
+    """Backtest every config and return result rows ranked best first.
+
+    Configs are split into chunks and run on a process pool: ``executor`` if
+    given (such as the shared ``get_worker_pool()``), otherwise one started
+    for this call. The price arrays are placed in shared memory once, so only
+    the configs are pickled. ``max_workers=1`` runs everything in the
+    calling process.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    chunks = [configs[i:i + chunk_size] for i in range(0, len(configs), chunk_size)]
+    
+    if max_workers <= 1 or len(chunks) <= 1:
+        results = _run_configs(configs, prices, initial_cash)
+    else:
+        results = []
+        with SharedPrices(prices) as shared:
+            pool = executor or ProcessPoolExecutor(max_workers=min(max_workers, len(chunks)))
+            try:
+                for chunk_results in pool.map(
+                    _run_chunk, itertools.repeat(shared.name), itertools.repeat(shared.shape),
+                    chunks, itertools.repeat(initial_cash)
+                ):
+                    results.extend(chunk_results)
+            finally:
+                if executor is None:
+                    pool.shutdown()
+    
+    results.sort(key=lambda r: r.get(rank_by, float('-inf')), reverse=True)
+    for rank, row in enumerate(results, start=1):
+        row['rank'] = rank
+    
+    return results
@@ -0,0 +1,124 @@
+from typing import Callable, Dict, Any, Optional
+from collections import OrderedDict
+import threading
+import time
+
+from .grid_trading import GridTradingEngine
+
+# Rough per-level cost of a GridLevel object (instance, __dict__ and boxed values)
+_LEVEL_OBJECT_BYTES = 400
+
+def estimate_engine_bytes(engine: GridTradingEngine) -> int:
+    """Approximate resident size of an engine's level storage and price index"""
+    index_bytes = sum(a.nbytes for a in (
+        engine._buy_ticks, engine._buy_index, engine._sell_ticks, engine._sell_index,
+        engine._index_ticks, engine._rearm_ticks, engine._number_order, engine._sorted_numbers
+    ))
+    if engine.compact:
+        return index_bytes + sum(a.nbytes for a in (
+            engine.level_numbers, engine.trigger_prices, engine.action_codes, engine.allocations,
+            engine.filled, engine.filled_prices, engine.filled_quantities
+        ))
+    return index_bytes + len(engine._levels) * _LEVEL_OBJECT_BYTES
+
+class EngineRegistry:
+    """Process-local cache of hot GridTradingEngine instances keyed by grid_config_id.
+
+    Entries are evicted least-recently-used first when either ``max_engines``
+    or ``max_bytes`` is exceeded, and expire ``ttl_seconds`` after loading.
+    Other processes (the Celery tasks) write fills and trigger prices straight
+    to the database, so a lookup that passes the current ``version`` of the
+    persisted state reloads when it changed. Lookups without a version can
+    serve an engine up to ``ttl_seconds`` stale.
+    """
+    
+    def __init__(self, max_engines: int = 10000, ttl_seconds: float = 900.0,
+                 max_bytes: int = 256 * 1024 * 1024, clock: Callable[[], float] = time.monotonic):
+        self.max_engines = max_engines
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # grid id -> (engine, loaded_at, nbytes, version)
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def __contains__(self, grid_config_id: str):
+        return self.get(grid_config_id) is not None
+    
+    def get(self, grid_config_id: str, version: Any = None) -> Optional[GridTradingEngine]:
+        """Cached engine, or None if missing, expired or loaded at a different ``version``"""
+        grid_config_id = str(grid_config_id)
+        with self._lock:
+            entry = self._entries.get(grid_config_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            engine, loaded_at, _, loaded_version = entry
+            stale = version is not None and version != loaded_version
+            if stale or self._clock() - loaded_at > self.ttl_seconds:
+                self._remove(grid_config_id)
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(grid_config_id)
+            self.hits += 1
+            return engine
+    
+    def put(self, grid_config_id: str, engine: GridTradingEngine, version: Any = None):
+        grid_config_id = str(grid_config_id)
+        nbytes = estimate_engine_bytes(engine)
+        with self._lock:
+            self._remove(grid_config_id)
+            self._entries[grid_config_id] = (engine, self._clock(), nbytes, version)
+            self._total_bytes += nbytes
+            self._evict()
+    
+    def get_or_load(self, grid_config_id: str, loader: Callable[[], GridTradingEngine],
+                    version: Any = None) -> GridTradingEngine:
+        """Return the cached engine, building it with ``loader`` on a miss or version change"""
+        engine = self.get(grid_config_id, version)
+        if engine is None:
+            engine = loader()
+            self.put(grid_config_id, engine, version)
+        return engine
+    
+    def invalidate(self, grid_config_id: str):
+        with self._lock:
+            self._remove(str(grid_config_id))
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'engines': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups > 0 else 0
+            }
+    
+    def _remove(self, grid_config_id: str):
+        entry = self._entries.pop(grid_config_id, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+    
+    def _evict(self):
+        # Always keep the most recently inserted engine, even if it alone exceeds the cap
+        while len(self._entries) > 1 and (
+                len(self._entries) > self.max_engines or self._total_bytes > self.max_bytes):
+            grid_config_id, (_, _, nbytes, _) = self._entries.popitem(last=False)
+            self._total_bytes -= nbytes
+
+# Shared registry for this worker process
+engine_registry = EngineRegistry()
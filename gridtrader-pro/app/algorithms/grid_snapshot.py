@@ -0,0 +1,161 @@
+from typing import Dict, Union
+import os
+import numpy as np
+
+from .grid_trading import GridConfig, GridTradingEngine, ACTION_CODES
+
+# File layout (little-endian):
+#   preamble      magic, format version, engine count, total level count
+#   engine table  one fixed-size record per engine (config and level slice)
+#   level columns one contiguous column per level field across all engines,
+#                 each starting on an 8-byte boundary
+SNAPSHOT_MAGIC = b'GRIDSNAP'
+SNAPSHOT_VERSION = 1
+
+_PREAMBLE_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('num_engines', '<u4'),
+    ('num_levels', '<u8')
+])
+
+_ENGINE_DTYPE = np.dtype([
+    ('grid_id', 'S36'),
+    ('symbol', 'S20'),
+    ('grid_type', 'S16'),
+    ('base_price', '<f8'),
+    ('grid_spacing', '<f8'),
+    ('base_spacing', '<f8'),
+    ('position_size', '<f8'),
+    ('num_grids_up', '<i4'),
+    ('num_grids_down', '<i4'),
+    ('level_offset', '<i8'),
+    ('level_count', '<i8'),
+    ('generated_layout', '?')
+])
+
+_LEVEL_COLUMNS = [
+    ('level_numbers', np.dtype('<i4')),
+    ('trigger_prices', np.dtype('<f8')),
+    ('action_codes', np.dtype('i1')),
+    ('allocations', np.dtype('<f8')),
+    ('filled', np.dtype('?')),
+    ('filled_prices', np.dtype('<f8')),
+    ('filled_quantities', np.dtype('<f8'))
+]
+
+class SnapshotError(ValueError):
+    pass
+
+def _align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+def _level_columns(engine: GridTradingEngine) -> Dict[str, np.ndarray]:
+    if engine.compact:
+        return {name: getattr(engine, name) for name, _ in _LEVEL_COLUMNS}
+    
+    levels = engine.levels
+    return {
+        'level_numbers': [l.level_number for l in levels],
+        'trigger_prices': [l.trigger_price for l in levels],
+        'action_codes': [ACTION_CODES[l.action] for l in levels],
+        'allocations': [l.target_allocation for l in levels],
+        'filled': [l.is_filled for l in levels],
+        'filled_prices': [np.nan if l.filled_price is None else l.filled_price for l in levels],
+        'filled_quantities': [np.nan if l.filled_quantity is None else l.filled_quantity for l in levels]
+    }
+
+def dumps(engines: Dict[str, GridTradingEngine]) -> bytes:
+    """Serialize engines keyed by grid id into one snapshot buffer"""
+    grid_ids = list(engines)
+    columns = [_level_columns(engines[g]) for g in grid_ids]
+    counts = np.array([len(c['level_numbers']) for c in columns], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+    num_levels = int(counts.sum())
+    
+    table = np.zeros(len(grid_ids), dtype=_ENGINE_DTYPE)
+    for i, grid_id in enumerate(grid_ids):
+        engine = engines[grid_id]
+        config = engine.config
+        table[i] = (
+            grid_id.encode(), config.symbol.encode(), config.grid_type.encode(),
+            config.base_price, config.grid_spacing, engine.base_spacing, config.position_size,
+            config.num_grids_up, config.num_grids_down,
+            offsets[i], counts[i], engine._closed_form
+        )
+    
+    preamble = np.array([(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(grid_ids), num_levels)], dtype=_PREAMBLE_DTYPE)
+    parts = [preamble.tobytes(), table.tobytes()]
+    size = _align(sum(len(p) for p in parts))
+    
+    for name, dtype in _LEVEL_COLUMNS:
+        parts.append(b'\0' * (size - sum(len(p) for p in parts)))
+        column = np.concatenate([np.asarray(c[name], dtype=dtype) for c in columns]) if columns \
+            else np.zeros(0, dtype=dtype)
+        parts.append(column.tobytes())
+        size = _align(size + column.nbytes)
+    
+    return b''.join(parts)
+
+def loads(buffer) -> Dict[str, GridTradingEngine]:
+    """Restore compact engines from a snapshot buffer.
+
+    Level arrays are views into ``buffer``; nothing is copied, so restoring
+    from a memory map only touches pages that are actually read. Read-only
+    buffers such as the ``bytes`` from ``dumps`` are copied once into a
+    ``bytearray`` so the restored engines can still be mutated.
+    """
+    if memoryview(buffer).readonly:
+        buffer = bytearray(buffer)
+    
+    preamble = np.frombuffer(buffer, dtype=_PREAMBLE_DTYPE, count=1)[0]
+    if bytes(preamble['magic']) != SNAPSHOT_MAGIC:
+        raise SnapshotError("Not a grid engine snapshot")
+    if int(preamble['version']) != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {int(preamble['version'])}")
+    
+    num_engines = int(preamble['num_engines'])
+    num_levels = int(preamble['num_levels'])
+    table = np.frombuffer(buffer, dtype=_ENGINE_DTYPE, count=num_engines, offset=_PREAMBLE_DTYPE.itemsize)
+    
+    offset = _align(_PREAMBLE_DTYPE.itemsize + table.nbytes)
+    columns = {}
+    for name, dtype in _LEVEL_COLUMNS:
+        columns[name] = np.frombuffer(buffer, dtype=dtype, count=num_levels, offset=offset)
+        offset = _align(offset + columns[name].nbytes)
+    
+    engines = {}
+    for record in table:
+        start = int(record['level_offset'])
+        stop = start + int(record['level_count'])
+        config = GridConfig(
+            symbol=record['symbol'].decode(),
+            base_price=float(record['base_price']),
+            grid_spacing=float(record['grid_spacing']),
+            num_grids_up=int(record['num_grids_up']),
+            num_grids_down=int(record['num_grids_down']),
+            position_size=float(record['position_size']),
+            grid_type=record['grid_type'].decode()
+        )
+        engines[record['grid_id'].decode()] = GridTradingEngine.from_arrays(
+            config,
+            *(columns[name][start:stop] for name, _ in _LEVEL_COLUMNS),
+            base_spacing=float(record['base_spacing']),
+            generated_layout=bool(record['generated_layout'])
+        )
+    
+    return engines
+
+def write_snapshot(path: Union[str, os.PathLike], engines: Dict[str, GridTradingEngine]):
+    """Write a snapshot atomically, replacing any existing file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(dumps(engines))
+    os.replace(tmp_path, path)
+
+def read_snapshot(path: Union[str, os.PathLike]) -> Dict[str, GridTradingEngine]:
+    """Restore every engine from a memory-mapped snapshot file.
+
+    The map is copy-on-write: engines can be mutated without touching the file.
+    """
+    return loads(np.memmap(path, dtype=np.uint8, mode='c'))
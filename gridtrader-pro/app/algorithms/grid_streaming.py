@@ -0,0 +1,95 @@
+from typing import Dict, List, Tuple, AsyncIterator, AsyncIterable, Any, Union
+from dataclasses import dataclass
+import asyncio
+
+from .grid_trading import GridAction, GridOrder, GridTradingEngine, coalesce_actions
+
+Tick = Tuple[str, float, Any]  # (symbol, price, timestamp)
+
+_END_OF_STREAM = object()
+
+@dataclass
+class StreamedAction:
+    grid_id: str
+    symbol: str
+    timestamp: Any
+    action: Union[GridAction, GridOrder]
+
+class GridStreamEvaluator:
+    """Push-style evaluation of live ticks against registered grid engines.
+
+    Ticks are read from an async iterator into a bounded queue. When the queue
+    is full the reader waits, so a slow consumer slows down the feed instead of
+    letting ticks pile up in memory.
+    """
+    
+    def __init__(self, max_queue_size: int = 1000, coalesce: bool = False, track_fills: bool = False):
+        """``coalesce=True`` emits one GridOrder per grid and side instead of one GridAction per level.
+
+        ``track_fills=True`` runs each engine's fill state machine, so a level
+        is emitted once when it fills and stays quiet until it re-arms.
+        """
+        self.max_queue_size = max_queue_size
+        self.coalesce = coalesce
+        self.track_fills = track_fills
+        self._engines: Dict[str, List[Tuple[str, GridTradingEngine]]] = {}
+    
+    def register(self, grid_id: str, engine: GridTradingEngine):
+        symbol = engine.config.symbol.upper()
+        self.unregister(grid_id)
+        self._engines.setdefault(symbol, []).append((str(grid_id), engine))
+    
+    def unregister(self, grid_id: str):
+        grid_id = str(grid_id)
+        for symbol in list(self._engines):
+            remaining = [entry for entry in self._engines[symbol] if entry[0] != grid_id]
+            if remaining:
+                self._engines[symbol] = remaining
+            else:
+                del self._engines[symbol]
+    
+    def evaluate_tick(self, symbol: str, price: float, timestamp: Any = None) -> List[StreamedAction]:
+        """Route one tick to every engine registered for its symbol"""
+        symbol = symbol.upper()
+        streamed = []
+        for grid_id, engine in self._engines.get(symbol, ()):
+            if self.track_fills:
+                actions = [t.to_action() for t in engine.process_price(price) if t.state == 'filled']
+            else:
+                actions = engine.check_triggers(price)
+            if self.coalesce:
+                actions = coalesce_actions(actions)
+            streamed.extend(
+                StreamedAction(grid_id=grid_id, symbol=symbol, timestamp=timestamp, action=action)
+                for action in actions
+            )
+        return streamed
+    
+    async def stream(self, ticks: AsyncIterable[Tick]) -> AsyncIterator[StreamedAction]:
+        """Consume ``(symbol, price, timestamp)`` ticks and yield actions as they trigger"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        feed_error: List[BaseException] = []
+        
+        async def _read_feed():
+            try:
+                async for tick in ticks:
+                    await queue.put(tick)
+            except Exception as e:
+                feed_error.append(e)
+            await queue.put(_END_OF_STREAM)
+        
+        reader = asyncio.create_task(_read_feed())
+        try:
+            while True:
+                tick = await queue.get()
+                if tick is _END_OF_STREAM:
+                    break
+                
+                symbol, price, timestamp = tick
+                for streamed in self.evaluate_tick(symbol, price, timestamp):
+                    yield streamed
+            
+            if feed_error:
+                raise feed_error[0]
+        finally:
+            reader.cancel()
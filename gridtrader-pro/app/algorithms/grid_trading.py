@@ -1,8 +1,39 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from decimal import Decimal
+import math
 import numpy as np
 
+# Compact action codes for array-based level storage
+ACTION_CODES = {'BUY': 1, 'SELL': -1}
+ACTION_NAMES = {1: 'BUY', -1: 'SELL'}
+
+# 'percentage': base * (1 + spacing% * n), 'fixed': base + spacing * n,
+# 'geometric': base * (1 + spacing%) ** n
+GRID_TYPES = ('percentage', 'fixed', 'geometric')
+
+# Price points visited per bar: open, first extreme, second extreme, close
+POINTS_PER_BAR = 4
+
+# Fixed-point prices: integer ticks of 10^-6, matching GridLevels.trigger_price DECIMAL(12, 6)
+PRICE_DECIMALS = 6
+TICKS_PER_UNIT = 10 ** PRICE_DECIMALS
+
+def to_ticks(prices) -> np.ndarray:
+    """Prices as int64 ticks, rounded to the nearest tick. NaN must be masked by the caller."""
+    return np.rint(np.asarray(prices, dtype=float) * TICKS_PER_UNIT).astype(np.int64)
+
+def from_ticks(ticks) -> np.ndarray:
+    """Float prices for int64 ticks; exact to the sixth decimal"""
+    return np.asarray(ticks, dtype=np.int64) / TICKS_PER_UNIT
+
+def ticks_to_decimal(ticks: int) -> Decimal:
+    """Exact Decimal for a tick count, for DECIMAL(12, 6) columns"""
+    return Decimal(int(ticks)).scaleb(-PRICE_DECIMALS)
+
+def price_to_decimal(price: float) -> Decimal:
+    return ticks_to_decimal(to_ticks(price))
+
 @dataclass
 class GridLevel:
     level_number: int
@@ -10,6 +41,8 @@ class GridLevel:
     action: str  # 'BUY' or 'SELL'
     target_allocation: float
     is_filled: bool = False
+    filled_price: Optional[float] = None
+    filled_quantity: Optional[float] = None
 
 @dataclass
 class GridAction:
@@ -18,6 +51,53 @@ class GridAction:
     quantity: float
     price: float
 
+@dataclass
+class GridOrder:
+    """All crossed levels of one grid and side merged into a single order"""
+    action: str
+    quantity: float
+    price: float  # quantity-weighted average of the level prices
+    level_ids: List[str]
+    level_quantities: List[float]
+    level_prices: List[float]
+
+def coalesce_actions(actions: List[GridAction]) -> List[GridOrder]:
+    """Merge per-level actions into at most one order per side, keeping the per-level breakdown.
+
+    Sides appear in the order they were first triggered; zero-quantity
+    orders fall back to the plain average price.
+    """
+    orders: Dict[str, GridOrder] = {}
+    for action in actions:
+        order = orders.get(action.action)
+        if order is None:
+            order = orders[action.action] = GridOrder(action.action, 0.0, 0.0, [], [], [])
+        order.level_ids.append(action.level_id)
+        order.level_quantities.append(action.quantity)
+        order.level_prices.append(action.price)
+        order.quantity += action.quantity
+    
+    for order in orders.values():
+        if order.quantity:
+            order.price = sum(q * p for q, p in zip(order.level_quantities, order.level_prices)) / order.quantity
+        else:
+            order.price = sum(order.level_prices) / len(order.level_prices)
+    
+    return list(orders.values())
+
+@dataclass
+class LevelTransition:
+    """A level changing state: 'filled' when it triggers, 'armed' once price crosses back one grid step"""
+    level_number: int
+    state: str
+    action: str
+    quantity: float
+    price: float
+    
+    def to_action(self) -> GridAction:
+        return GridAction(level_id=str(self.level_number), action=self.action,
+                          quantity=self.quantity, price=self.price)
+
 @dataclass
 class GridConfig:
     symbol: str
@@ -28,81 +108,565 @@ class GridConfig:
     position_size: float
     grid_type: str = "percentage"
 
+@dataclass
+class BarCrossings:
+    bars: np.ndarray  # bar index of each crossing, in path order
+    level_numbers: np.ndarray
+    action_codes: np.ndarray
+    trigger_prices: np.ndarray
+    allocations: np.ndarray
+
+    def __len__(self):
+        return len(self.bars)
+
+    def to_actions(self) -> List[GridAction]:
+        """One GridAction per crossing, filled at the level price"""
+        return [
+            GridAction(
+                level_id=str(number),
+                action=ACTION_NAMES[code],
+                quantity=allocation,
+                price=price
+            )
+            for number, code, allocation, price in zip(
+                self.level_numbers.tolist(),
+                self.action_codes.tolist(),
+                self.allocations.tolist(),
+                self.trigger_prices.tolist()
+            )
+        ]
+
+def bar_path(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Deterministic intrabar price path, flattened to ``POINTS_PER_BAR`` points per bar.
+
+    Up bars (close >= open) are assumed to visit open -> low -> high -> close,
+    down bars open -> high -> low -> close.
+    """
+    open_ = np.asarray(open_, dtype=float)
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    
+    up_bar = close >= open_
+    path = np.empty(open_.shape + (POINTS_PER_BAR,), dtype=float)
+    path[..., 0] = open_
+    path[..., 1] = np.where(up_bar, low, high)
+    path[..., 2] = np.where(up_bar, high, low)
+    path[..., 3] = close
+    return path.reshape(open_.shape[:-1] + (-1,))
+
+def _expand_ranges(starts: np.ndarray, stops: np.ndarray, descending: np.ndarray):
+    """Flatten [start, stop) ranges into (range id, value) pairs without a Python loop"""
+    counts = np.maximum(stops - starts, 0)
+    owner = np.repeat(np.arange(len(starts)), counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    values = np.where(
+        descending[owner],
+        stops[owner] - 1 - offset,
+        starts[owner] + offset
+    )
+    return owner, values
+
 class GridTradingEngine:
-    def __init__(self, config: GridConfig):
+    def __init__(self, config: GridConfig, compact: bool = False):
+        """``compact=True`` stores levels as parallel NumPy arrays instead of GridLevel objects"""
+        if config.grid_type not in GRID_TYPES:
+            raise ValueError(f"Unknown grid type: {config.grid_type}")
+        
         self.config = config
-        self.levels = self._generate_grid_levels()
+        self.compact = compact
+        # Volatility adjustments scale this, so repeated updates do not compound
+        self.base_spacing = config.grid_spacing
+        self._regenerate_levels()
     
-    def _generate_grid_levels(self) -> List[GridLevel]:
-        levels = []
+    @property
+    def levels(self) -> List[GridLevel]:
+        """Grid levels; in compact mode this is a fresh list built from the arrays"""
+        if not self.compact:
+            return self._levels
+        
+        return [self._level_at(pos) for pos in range(len(self.level_numbers))]
+    
+    @levels.setter
+    def levels(self, levels: List[GridLevel]):
+        self._closed_form = False
+        if self.compact:
+            self._set_level_arrays(
+                [l.level_number for l in levels],
+                [l.trigger_price for l in levels],
+                [ACTION_CODES[l.action] for l in levels],
+                [l.target_allocation for l in levels],
+                [l.is_filled for l in levels],
+                [np.nan if l.filled_price is None else l.filled_price for l in levels],
+                [np.nan if l.filled_quantity is None else l.filled_quantity for l in levels]
+            )
+        else:
+            self._levels = list(levels)
+            self._build_price_index()
+    
+    def _level_prices(self, level_numbers: np.ndarray) -> np.ndarray:
+        """Trigger prices for signed level numbers at the current spacing"""
         base_price = self.config.base_price
         spacing = self.config.grid_spacing
         
-        # Generate buy levels (below base price)
-        for i in range(1, self.config.num_grids_down + 1):
-            price = base_price * (1 - spacing * i / 100)
-            levels.append(GridLevel(
-                level_number=-i,
-                trigger_price=price,
-                action='BUY',
-                target_allocation=self.config.position_size
-            ))
+        if self.config.grid_type == 'fixed':
+            return base_price + spacing * level_numbers
+        if self.config.grid_type == 'geometric':
+            return base_price * (1 + spacing / 100) ** level_numbers
+        return base_price * (1 + spacing * level_numbers / 100)
+    
+    def _level_ticks(self, level_numbers: np.ndarray) -> np.ndarray:
+        """``_level_prices`` rounded to integer ticks"""
+        return to_ticks(self._level_prices(level_numbers))
+    
+    def _level_index(self, price: float) -> float:
+        """Continuous level number at ``price``: the inverse of ``_level_prices``"""
+        base_price = self.config.base_price
+        spacing = self.config.grid_spacing
+        
+        if self.config.grid_type == 'fixed':
+            return (price - base_price) / spacing
+        if self.config.grid_type == 'geometric':
+            if price <= 0:
+                return -math.inf
+            return math.log(price / base_price) / math.log(1 + spacing / 100)
+        return (price / base_price - 1) * 100 / spacing
+    
+    def _generate_level_arrays(self):
+        """Level numbers, trigger prices, action codes, allocations and fill flags as arrays"""
+        down = np.arange(1, self.config.num_grids_down + 1)
+        up = np.arange(1, self.config.num_grids_up + 1)
+        
+        # Buy levels below the base price, then sell levels above it
+        level_numbers = np.concatenate((-down, up)).astype(np.int32)
+        # Quantized to ticks so generated prices round-trip through the DB unchanged
+        trigger_prices = from_ticks(self._level_ticks(level_numbers))
+        action_codes = np.concatenate((
+            np.full(len(down), ACTION_CODES['BUY']),
+            np.full(len(up), ACTION_CODES['SELL'])
+        )).astype(np.int8)
+        allocations = np.full(len(level_numbers), self.config.position_size, dtype=float)
+        filled = np.zeros(len(level_numbers), dtype=bool)
         
-        # Generate sell levels (above base price)  
-        for i in range(1, self.config.num_grids_up + 1):
-            price = base_price * (1 + spacing * i / 100)
-            levels.append(GridLevel(
-                level_number=i,
+        return level_numbers, trigger_prices, action_codes, allocations, filled
+    
+    def _generate_grid_levels(self) -> List[GridLevel]:
+        level_numbers, trigger_prices, action_codes, allocations, _ = self._generate_level_arrays()
+        
+        return [
+            GridLevel(
+                level_number=number,
                 trigger_price=price,
-                action='SELL',
-                target_allocation=self.config.position_size
-            ))
+                action=ACTION_NAMES[code],
+                target_allocation=allocation
+            )
+            for number, price, code, allocation in zip(
+                level_numbers.tolist(), trigger_prices.tolist(), action_codes.tolist(), allocations.tolist()
+            )
+        ]
+    
+    def _regenerate_levels(self):
+        if self.compact:
+            self._set_level_arrays(*self._generate_level_arrays())
+        else:
+            self.levels = self._generate_grid_levels()
+        # Generated levels are laid out as -num_grids_down..-1, 1..num_grids_up
+        self._closed_form = self.config.grid_spacing > 0
+    
+    def _set_level_arrays(self, level_numbers, trigger_prices, action_codes, allocations, filled,
+                          filled_prices=None, filled_quantities=None):
+        """Install compact level arrays; unknown fill prices and quantities are NaN"""
+        self._levels = None
+        self.level_numbers = np.asarray(level_numbers, dtype=np.int32)
+        self.trigger_prices = np.asarray(trigger_prices, dtype=float)
+        self.action_codes = np.asarray(action_codes, dtype=np.int8)
+        self.allocations = np.asarray(allocations, dtype=float)
+        self.filled = np.asarray(filled, dtype=bool)
         
-        return levels
+        num_levels = len(self.level_numbers)
+        self.filled_prices = np.full(num_levels, np.nan) if filled_prices is None \
+            else np.asarray(filled_prices, dtype=float)
+        self.filled_quantities = np.full(num_levels, np.nan) if filled_quantities is None \
+            else np.asarray(filled_quantities, dtype=float)
+        
+        self._build_price_index()
     
-    def check_triggers(self, current_price: float) -> List[GridAction]:
-        actions = []
+    @classmethod
+    def from_arrays(cls, config: GridConfig, level_numbers, trigger_prices, action_codes, allocations,
+                    filled, filled_prices=None, filled_quantities=None, base_spacing: Optional[float] = None,
+                    generated_layout: bool = False) -> 'GridTradingEngine':
+        """Build a compact engine around existing level arrays without regenerating them.
+
+        Arrays are used as given (no copy when dtypes already match), so they
+        may be views into a larger buffer. ``generated_layout`` marks arrays in
+        the order produced by level generation, enabling O(1) lookups.
+        """
+        if config.grid_type not in GRID_TYPES:
+            raise ValueError(f"Unknown grid type: {config.grid_type}")
+        
+        engine = cls.__new__(cls)
+        engine.config = config
+        engine.compact = True
+        engine.base_spacing = config.grid_spacing if base_spacing is None else base_spacing
+        engine._closed_form = False
+        engine._set_level_arrays(level_numbers, trigger_prices, action_codes, allocations,
+                                 filled, filled_prices, filled_quantities)
+        engine._closed_form = generated_layout and config.grid_spacing > 0
+        return engine
+    
+    def _build_price_index(self):
+        """Keep BUY and SELL trigger prices as sorted int64 tick arrays for binary search.
+
+        Called whenever ``self.levels`` is replaced. All trigger comparisons
+        are made in ticks, so they agree exactly with persisted prices.
+        """
+        if self.compact:
+            prices, codes, numbers = self.trigger_prices, self.action_codes, self.level_numbers
+        else:
+            prices = np.array([l.trigger_price for l in self._levels], dtype=float)
+            codes = np.array([ACTION_CODES[l.action] for l in self._levels], dtype=np.int8)
+            numbers = np.array([l.level_number for l in self._levels], dtype=np.int32)
+        
+        buy_idx = np.flatnonzero(codes == ACTION_CODES['BUY'])
+        sell_idx = np.flatnonzero(codes == ACTION_CODES['SELL'])
+        
+        ticks = to_ticks(prices)
+        buy_order = np.argsort(ticks[buy_idx], kind='stable')
+        sell_order = np.argsort(ticks[sell_idx], kind='stable')
         
-        for level in self.levels:
+        self._buy_ticks = ticks[buy_idx][buy_order]
+        self._buy_index = buy_idx[buy_order]
+        self._sell_ticks = ticks[sell_idx][sell_order]
+        self._sell_index = sell_idx[sell_order]
+        
+        self._index_numbers = numbers
+        self._index_prices = prices
+        self._index_ticks = ticks
+        self._index_codes = codes
+        
+        # Level number -> position lookup
+        self._number_order = np.argsort(numbers, kind='stable')
+        self._sorted_numbers = numbers[self._number_order]
+        self._rearm_ticks = self._neighbour_ticks(ticks)
+        
+        # Running fill counters read by get_grid_statistics
+        filled = self._filled_flags()
+        self._filled_counts = {
+            'BUY': int(np.count_nonzero(filled[buy_idx])),
+            'SELL': int(np.count_nonzero(filled[sell_idx]))
+        }
+    
+    def _neighbour_ticks(self, ticks: np.ndarray) -> np.ndarray:
+        """Re-arm tick per level: the stored tick of its neighbour one step back toward the base price.
+
+        BUY levels look at the next level up and SELL levels at the next one
+        down in level-number order; levels next to the base price (or whose
+        neighbour is on the other side of it) use the base price. Reading the
+        stored ticks keeps respaced, reloaded and custom grids consistent.
+        """
+        order, sorted_numbers = self._number_order, self._sorted_numbers
+        sorted_ticks = ticks[order]
+        base_ticks = int(to_ticks(self.config.base_price))
+        
+        above = np.append(sorted_ticks[1:], base_ticks)
+        above = np.where(np.append(sorted_numbers[1:], 0) < 0, above, base_ticks)
+        below = np.insert(sorted_ticks[:-1], 0, base_ticks)
+        below = np.where(np.insert(sorted_numbers[:-1], 0, 0) > 0, below, base_ticks)
+        
+        rearm = np.empty(len(ticks), dtype=np.int64)
+        rearm[order] = np.where(self._index_codes[order] == ACTION_CODES['BUY'], above, below)
+        return rearm
+    
+    def _level_position(self, level_number: int) -> int:
+        if self._closed_form:
+            # Generated layout: -1..-num_grids_down, then 1..num_grids_up
+            num_buys = len(self._buy_index)
+            if level_number < 0 and -level_number <= num_buys:
+                return -level_number - 1
+            if level_number > 0 and level_number <= len(self._sell_index):
+                return num_buys + level_number - 1
+            raise KeyError(f"Unknown grid level {level_number}")
+        
+        pos = int(np.searchsorted(self._sorted_numbers, level_number))
+        if pos == len(self._sorted_numbers) or self._sorted_numbers[pos] != level_number:
+            raise KeyError(f"Unknown grid level {level_number}")
+        return int(self._number_order[pos])
+    
+    def _level_at(self, pos: int) -> GridLevel:
+        if not self.compact:
+            return self._levels[pos]
+        filled_price = float(self.filled_prices[pos])
+        filled_quantity = float(self.filled_quantities[pos])
+        return GridLevel(
+            level_number=int(self.level_numbers[pos]),
+            trigger_price=float(self.trigger_prices[pos]),
+            action=ACTION_NAMES[int(self.action_codes[pos])],
+            target_allocation=float(self.allocations[pos]),
+            is_filled=bool(self.filled[pos]),
+            filled_price=None if math.isnan(filled_price) else filled_price,
+            filled_quantity=None if math.isnan(filled_quantity) else filled_quantity
+        )
+    
+    def set_filled(self, level_number: int, is_filled: bool = True,
+                   price: Optional[float] = None, quantity: Optional[float] = None):
+        """Set a level's fill flag, and optionally its fill price and quantity, in either storage mode.
+
+        Fills should go through here so the statistics counters stay in step.
+        """
+        pos = self._level_position(level_number)
+        if self.compact:
+            was_filled = bool(self.filled[pos])
+            action = ACTION_NAMES[int(self.action_codes[pos])]
+            self.filled[pos] = is_filled
+            if price is not None:
+                self.filled_prices[pos] = price
+            if quantity is not None:
+                self.filled_quantities[pos] = quantity
+        else:
+            level = self._levels[pos]
+            was_filled, action = level.is_filled, level.action
+            level.is_filled = is_filled
+            if price is not None:
+                level.filled_price = price
+            if quantity is not None:
+                level.filled_quantity = quantity
+        
+        if was_filled != bool(is_filled):
+            self._filled_counts[action] += 1 if is_filled else -1
+    
+    def _actions_for(self, indices: np.ndarray, action: str, current_price: float) -> List[GridAction]:
+        """GridActions for the unfilled levels among ``indices``, in order"""
+        if self.compact:
+            indices = indices[~self.filled[indices]]
+            return [
+                GridAction(
+                    level_id=str(number),
+                    action=action,
+                    quantity=allocation,
+                    price=current_price
+                )
+                for number, allocation in zip(
+                    self.level_numbers[indices].tolist(),
+                    self.allocations[indices].tolist()
+                )
+            ]
+        
+        actions = []
+        for i in indices:
+            level = self._levels[i]
             if not level.is_filled:
-                if level.action == 'BUY' and current_price <= level.trigger_price:
-                    actions.append(GridAction(
-                        level_id=str(level.level_number),
-                        action='BUY',
-                        quantity=level.target_allocation,
-                        price=current_price
-                    ))
-                elif level.action == 'SELL' and current_price >= level.trigger_price:
-                    actions.append(GridAction(
-                        level_id=str(level.level_number),
-                        action='SELL',
-                        quantity=level.target_allocation,
-                        price=current_price
-                    ))
+                actions.append(GridAction(
+                    level_id=str(level.level_number),
+                    action=action,
+                    quantity=level.target_allocation,
+                    price=current_price
+                ))
+        return actions
+    
+    def _trigger_bounds(self, price_ticks: int):
+        """Number of untriggered BUY levels and of triggered SELL levels at a price in ticks.
+
+        BUY levels trigger at or below their price, so they are the tail of the
+        ascending BUY array from ``start``; SELL levels are its head up to ``end``.
+        Generated grids map the price straight to a level number in O(1);
+        custom level lists fall back to binary search.
+        """
+        num_buys = len(self._buy_ticks)
+        num_sells = len(self._sell_ticks)
+        
+        if not self._closed_form:
+            start = int(np.searchsorted(self._buy_ticks, price_ticks, side='left'))
+            end = int(np.searchsorted(self._sell_ticks, price_ticks, side='right'))
+            return start, end
+        
+        level = min(max(self._level_index(price_ticks / TICKS_PER_UNIT), -num_buys - 1.0), num_sells + 1.0)
+        
+        # BUY level -n sits at position num_buys - n, SELL level n at position n - 1
+        start = min(max(math.ceil(level) + num_buys, 0), num_buys)
+        end = min(max(math.floor(level), 0), num_sells)
+        
+        # Step past any rounding error in the inverse against the stored ticks
+        while start > 0 and self._buy_ticks[start - 1] >= price_ticks:
+            start -= 1
+        while start < num_buys and self._buy_ticks[start] < price_ticks:
+            start += 1
+        while end < num_sells and self._sell_ticks[end] <= price_ticks:
+            end += 1
+        while end > 0 and self._sell_ticks[end - 1] > price_ticks:
+            end -= 1
+        
+        return start, end
+    
+    def check_triggers(self, current_price: float) -> List[GridAction]:
+        if math.isnan(current_price):
+            return []
+        
+        start, end = self._trigger_bounds(int(to_ticks(current_price)))
+        
+        # BUY levels from the tail of the ascending array, nearest the base first
+        actions = self._actions_for(self._buy_index[start:][::-1], 'BUY', current_price)
+        
+        # SELL levels from the head of the ascending array
+        actions.extend(self._actions_for(self._sell_index[:end], 'SELL', current_price))
         
         return actions
     
-    def update_grid_spacing(self, volatility: float):
-        """Dynamically adjust grid spacing based on volatility"""
-        base_spacing = self.config.grid_spacing
-        volatility_multiplier = min(max(volatility / 0.02, 0.5), 2.0)  # Clamp between 0.5x and 2.0x
-        new_spacing = base_spacing * volatility_multiplier
+    def _filled_flags(self) -> np.ndarray:
+        if self.compact:
+            return self.filled
+        return np.array([l.is_filled for l in self._levels], dtype=bool)
+    
+    def check_bar_triggers(self, open_, high, low, close, prev_close=None) -> BarCrossings:
+        """Detect every level crossed within OHLC bars, in path order.
+
+        Accepts scalars or equal-length arrays. Each bar is walked along
+        ``bar_path``; BUY levels are crossed by downward moves and SELL
+        levels by upward ones, nearest level first. The walk starts from
+        ``prev_close`` (the base price if omitted), so opening gaps count.
+        Missing (NaN) prices hold the last known price, so a gap crosses
+        nothing until prices resume. Filled levels are skipped.
+        """
+        path = bar_path(np.atleast_1d(open_), np.atleast_1d(high), np.atleast_1d(low), np.atleast_1d(close))
+        start = self.config.base_price if prev_close is None or math.isnan(prev_close) else prev_close
+        path = np.concatenate(([start], path))
+        
+        valid = ~np.isnan(path)
+        if not valid.all():
+            path = path[np.maximum.accumulate(np.where(valid, np.arange(len(path)), 0))]
+        
+        path = to_ticks(path)
+        seg_from, seg_to = path[:-1], path[1:]
+        
+        # BUY levels in [to, from) on down moves, SELL levels in (from, to] on up moves
+        down = seg_to < seg_from
+        buy_lo = np.searchsorted(self._buy_ticks, seg_to, side='left')
+        buy_hi = np.searchsorted(self._buy_ticks, seg_from, side='left')
+        sell_lo = np.searchsorted(self._sell_ticks, seg_from, side='right')
+        sell_hi = np.searchsorted(self._sell_ticks, seg_to, side='right')
+        
+        starts = np.where(down, buy_lo, sell_lo)
+        stops = np.where(down, buy_hi, np.where(seg_to > seg_from, sell_hi, sell_lo))
+        segment, sorted_pos = _expand_ranges(starts, stops, down)
+        
+        is_buy = down[segment]
+        sorted_index = np.concatenate((self._buy_index, self._sell_index))
+        positions = sorted_index[np.where(is_buy, sorted_pos, sorted_pos + len(self._buy_index))]
+        
+        keep = ~self._filled_flags()[positions]
+        segment, positions, is_buy = segment[keep], positions[keep], is_buy[keep]
+        
+        if self.compact:
+            level_numbers, prices, allocations = self.level_numbers, self.trigger_prices, self.allocations
+        else:
+            level_numbers = self._index_numbers
+            prices = self._index_prices
+            allocations = np.array([l.target_allocation for l in self._levels], dtype=float)
+        
+        return BarCrossings(
+            bars=segment // POINTS_PER_BAR,
+            level_numbers=level_numbers[positions],
+            action_codes=np.where(is_buy, ACTION_CODES['BUY'], ACTION_CODES['SELL']).astype(np.int8),
+            trigger_prices=prices[positions],
+            allocations=allocations[positions]
+        )
+    
+    @property
+    def rearm_ticks(self) -> np.ndarray:
+        """Per-level price in ticks at which a filled level re-arms, aligned with the level storage"""
+        return self._rearm_ticks
+    
+    def process_price(self, current_price: float) -> List[LevelTransition]:
+        """Advance the level state machine to a new price and return only the transitions.
+
+        Crossed armed levels become filled at ``current_price``; filled BUY
+        levels re-arm once the price is back at or above the next level up,
+        filled SELL levels once it is back at or below the next level down.
+        Repeated calls at the same price return nothing.
+        """
+        if math.isnan(current_price):
+            return []
+        
+        price_ticks = int(to_ticks(current_price))
+        is_buy = self._index_codes == ACTION_CODES['BUY']
+        crossed_back = np.where(is_buy, price_ticks >= self._rearm_ticks, price_ticks <= self._rearm_ticks)
         
+        transitions = []
+        for pos in np.flatnonzero(self._filled_flags() & crossed_back).tolist():
+            level = self._level_at(pos)
+            self.set_filled(level.level_number, False)
+            transitions.append(LevelTransition(
+                level.level_number, 'armed', level.action, level.target_allocation, current_price
+            ))
+        
+        for action in self.check_triggers(current_price):
+            level_number = int(action.level_id)
+            self.set_filled(level_number, True, price=current_price, quantity=action.quantity)
+            transitions.append(LevelTransition(
+                level_number, 'filled', action.action, action.quantity, current_price
+            ))
+        
+        return transitions
+    
+    def check_triggers_coalesced(self, current_price: float) -> List[GridOrder]:
+        """Like check_triggers, but with all crossed levels merged into one order per side"""
+        return coalesce_actions(self.check_triggers(current_price))
+    
+    def update_grid_spacing(self, volatility: float) -> List[GridLevel]:
+        """Dynamically adjust grid spacing based on volatility.
+
+        The multiplier is applied to ``base_spacing``, not the current spacing.
+        Returns the levels whose trigger price changed.
+        """
+        volatility_multiplier = min(max(volatility / 0.02, 0.5), 2.0)  # Clamp between 0.5x and 2.0x
+        return self.respace(self.base_spacing * volatility_multiplier)
+    
+    def respace(self, new_spacing: float) -> List[GridLevel]:
+        """Recompute trigger prices in place, keeping every level's fill state.
+
+        Returns only the levels whose trigger price changed, so persisted
+        GridLevels rows can be updated by diff.
+        """
         self.config.grid_spacing = new_spacing
-        self.levels = self._generate_grid_levels()
+        self._closed_form = self._closed_form and new_spacing > 0
+        
+        new_ticks = self._level_ticks(self._index_numbers)
+        changed = np.flatnonzero(new_ticks != self._index_ticks)
+        new_prices = from_ticks(new_ticks)
+        
+        if self.compact:
+            self.trigger_prices[changed] = new_prices[changed]
+        else:
+            for pos, price in zip(changed.tolist(), new_prices[changed].tolist()):
+                self._levels[pos].trigger_price = price
+        
+        # Prices stay monotonic in level number, so the sorted order is unchanged
+        self._index_prices = new_prices if not self.compact else self.trigger_prices
+        self._index_ticks = new_ticks
+        self._buy_ticks = new_ticks[self._buy_index]
+        self._sell_ticks = new_ticks[self._sell_index]
+        self._rearm_ticks = self._neighbour_ticks(new_ticks)
+        
+        return [self._level_at(pos) for pos in changed.tolist()]
     
     def get_grid_statistics(self) -> Dict[str, Any]:
-        filled_levels = [l for l in self.levels if l.is_filled]
-        total_levels = len(self.levels)
+        """Grid statistics read from running counters and the sorted price index"""
+        total_levels = len(self._buy_ticks) + len(self._sell_ticks)
+        buy_filled = self._filled_counts['BUY']
+        sell_filled = self._filled_counts['SELL']
+        filled_levels = buy_filled + sell_filled
+        
+        # Both tick arrays are sorted ascending, so the bounds are at their ends
+        lows = [a[0] for a in (self._buy_ticks, self._sell_ticks) if len(a)]
+        highs = [a[-1] for a in (self._buy_ticks, self._sell_ticks) if len(a)]
         
         return {
             'total_levels': total_levels,
-            'filled_levels': len(filled_levels),
-            'utilization_rate': len(filled_levels) / total_levels if total_levels > 0 else 0,
-            'buy_levels_filled': len([l for l in filled_levels if l.action == 'BUY']),
-            'sell_levels_filled': len([l for l in filled_levels if l.action == 'SELL']),
+            'filled_levels': filled_levels,
+            'utilization_rate': filled_levels / total_levels if total_levels > 0 else 0,
+            'buy_levels_filled': buy_filled,
+            'sell_levels_filled': sell_filled,
             'price_range': {
-                'min': min([l.trigger_price for l in self.levels]),
-                'max': max([l.trigger_price for l in self.levels])
+                'min': int(min(lows)) / TICKS_PER_UNIT if lows else None,
+                'max': int(max(highs)) / TICKS_PER_UNIT if highs else None
             }
         }
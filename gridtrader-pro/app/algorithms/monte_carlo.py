@@ -0,0 +1,179 @@
+from typing import Dict, Any, Optional, List
+from dataclasses import dataclass
+from concurrent.futures import Executor, ProcessPoolExecutor
+import os
+import numpy as np
+
+from .grid_trading import GridConfig
+from .grid_backtest import grid_lots, lot_states
+
+SIMULATION_MODELS = ('gbm', 'bootstrap')
+
+# Peak memory of simulate_paths per (path, level, point) cell: two int32 event
+# indices from lot_states plus the boolean masks derived from them
+_BYTES_PER_CELL = 16
+# Default memory budget for one chunk of paths, per worker
+CHUNK_BYTES = 64 * 1024 * 1024
+
+@dataclass
+class MonteCarloResult:
+    final_pnl: np.ndarray  # one entry per path
+    max_drawdown: np.ndarray  # fraction of peak equity
+    capital_usage: np.ndarray  # peak fraction of starting cash deployed
+    initial_equity: float
+
+    def summary(self, ruin_drawdown: float = 0.5) -> Dict[str, Any]:
+        """Distribution summary; a path is ruined if it exhausts its cash or draws down past ``ruin_drawdown``"""
+        percentiles = [5, 25, 50, 75, 95]
+        
+        def _distribution(values):
+            return {
+                'mean': float(values.mean()),
+                'std': float(values.std()),
+                **{f'p{p}': float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))}
+            }
+        
+        ruined = (self.capital_usage >= 1.0 - 1e-9) | (self.max_drawdown >= ruin_drawdown)
+        
+        return {
+            'paths': len(self.final_pnl),
+            'initial_equity': self.initial_equity,
+            'final_pnl': _distribution(self.final_pnl),
+            'max_drawdown': _distribution(self.max_drawdown),
+            'capital_usage': _distribution(self.capital_usage),
+            'probability_of_loss': float(np.mean(self.final_pnl < 0)),
+            'risk_of_ruin': float(np.mean(ruined))
+        }
+
+def gbm_paths(start_price: float, n_paths: int, n_steps: int, mu: float = 0.0, sigma: float = 0.02,
+              rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Geometric Brownian motion with per-step drift ``mu`` and volatility ``sigma``.
+
+    Returns (n_paths, n_steps + 1) prices starting at ``start_price``.
+    """
+    rng = rng or np.random.default_rng()
+    log_returns = rng.normal(mu - 0.5 * sigma ** 2, sigma, size=(n_paths, n_steps))
+    return _paths_from_returns(start_price, log_returns)
+
+def bootstrap_paths(start_price: float, returns: np.ndarray, n_paths: int, n_steps: int,
+                    block_size: int = 1, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Resample historical log returns in blocks of ``block_size`` consecutive steps"""
+    rng = rng or np.random.default_rng()
+    returns = np.asarray(returns, dtype=float)
+    block_size = max(1, min(block_size, len(returns)))
+    
+    n_blocks = -(-n_steps // block_size)
+    starts = rng.integers(0, len(returns) - block_size + 1, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)[:, :n_steps]
+    return _paths_from_returns(start_price, returns[idx])
+
+def _paths_from_returns(start_price: float, log_returns: np.ndarray) -> np.ndarray:
+    paths = np.empty((log_returns.shape[0], log_returns.shape[1] + 1))
+    paths[:, 0] = start_price
+    paths[:, 1:] = start_price * np.exp(np.cumsum(log_returns, axis=1))
+    return paths
+
+def simulate_paths(config: GridConfig, paths: np.ndarray, initial_cash: Optional[float] = None) -> MonteCarloResult:
+    """Run the grid lot logic over every path at once.
+
+    ``paths`` is (n_paths, points) and should start at the base price. Uses
+    the same lot model as ``backtest_grid``, with each point a price step.
+    """
+    level_numbers, buy_prices, sell_prices, starts_held = grid_lots(config)
+    units = config.position_size / buy_prices
+    
+    if initial_cash is None:
+        initial_cash = float(config.position_size * np.count_nonzero(~starts_held))
+    initial_position = float(units[starts_held].sum())
+    initial_equity = initial_cash + initial_position * config.base_price
+    
+    held = lot_states(paths, buy_prices, sell_prices, starts_held)  # (paths, levels, points)
+    changed = held[..., 1:] != held[..., :-1]
+    buys = changed & held[..., 1:]
+    sells = changed & ~held[..., 1:]
+    
+    # (paths, steps) cash and position flows summed over levels
+    cash_flow = np.einsum('nlk,l->nk', sells, units * sell_prices) - np.einsum('nlk,l->nk', buys, units * buy_prices)
+    position_flow = np.einsum('nlk,l->nk', buys, units) - np.einsum('nlk,l->nk', sells, units)
+    
+    cash = initial_cash + np.cumsum(cash_flow, axis=1)
+    position = initial_position + np.cumsum(position_flow, axis=1)
+    equity = np.concatenate((
+        np.full((len(paths), 1), initial_equity),
+        cash + position * paths[:, 1:]
+    ), axis=1)
+    
+    running_max = np.maximum.accumulate(equity, axis=1)
+    # Grids with nothing to fill have zero equity throughout: no drawdown rather than 0/0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        max_drawdown = np.where(running_max > 0, (running_max - equity) / running_max, 0.0).max(axis=1)
+    
+    min_cash = np.minimum(cash.min(axis=1), initial_cash) if cash.shape[1] else np.full(len(paths), initial_cash)
+    capital_usage = (initial_cash - min_cash) / initial_cash if initial_cash > 0 else np.zeros(len(paths))
+    
+    return MonteCarloResult(
+        final_pnl=equity[:, -1] - initial_equity,
+        max_drawdown=max_drawdown,
+        capital_usage=capital_usage,
+        initial_equity=initial_equity
+    )
+
+def _simulate_chunk(config: GridConfig, model: str, n_paths: int, n_steps: int, seed: np.random.SeedSequence,
+                    mu: float, sigma: float, returns: Optional[np.ndarray], block_size: int,
+                    initial_cash: Optional[float]) -> MonteCarloResult:
+    rng = np.random.default_rng(seed)
+    if model == 'bootstrap':
+        paths = bootstrap_paths(config.base_price, returns, n_paths, n_steps, block_size, rng)
+    else:
+        paths = gbm_paths(config.base_price, n_paths, n_steps, mu, sigma, rng)
+    return simulate_paths(config, paths, initial_cash)
+
+def simulate_grid(config: GridConfig, n_paths: int = 10000, n_steps: int = 252, model: str = 'gbm',
+                  mu: float = 0.0, sigma: float = 0.02, returns: Optional[np.ndarray] = None,
+                  block_size: int = 1, initial_cash: Optional[float] = None, seed: Optional[int] = None,
+                  chunk_size: Optional[int] = None, chunk_bytes: int = CHUNK_BYTES,
+                  max_workers: Optional[int] = None, executor: Optional[Executor] = None) -> MonteCarloResult:
+    """Monte Carlo distribution of grid outcomes over synthetic price paths.
+
+    Paths are generated and evaluated in chunks sized so that one chunk
+    needs about ``chunk_bytes`` (at least one path, at most ``chunk_size``
+    paths if given). Peak memory is therefore roughly the worker count times
+    ``chunk_bytes``. Chunks are spread over a process pool (``executor`` if given). Each chunk gets its own
+    child seed, so results are reproducible for a given ``seed`` regardless
+    of worker count. ``model='bootstrap'`` resamples ``returns`` (historical
+    log returns); ``'gbm'`` uses ``mu``/``sigma`` per step.
+    """
+    if model not in SIMULATION_MODELS:
+        raise ValueError(f"Unknown simulation model: {model}")
+    if model == 'bootstrap' and (returns is None or len(returns) == 0):
+        raise ValueError("Bootstrap simulation needs historical returns")
+    
+    num_levels = len(grid_lots(config)[0])
+    chunk_size = min(
+        max(1, chunk_bytes // (max(num_levels, 1) * (n_steps + 1) * _BYTES_PER_CELL)),
+        chunk_size or n_paths
+    )
+    chunk_sizes = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    args = [
+        (config, model, size, n_steps, chunk_seed, mu, sigma, returns, block_size, initial_cash)
+        for size, chunk_seed in zip(chunk_sizes, seeds)
+    ]
+    
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    
+    if max_workers <= 1 or len(args) <= 1:
+        results: List[MonteCarloResult] = [_simulate_chunk(*a) for a in args]
+    elif executor is not None:
+        results = list(executor.map(_simulate_chunk, *zip(*args)))
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(args))) as pool:
+            results = list(pool.map(_simulate_chunk, *zip(*args)))
+    
+    return MonteCarloResult(
+        final_pnl=np.concatenate([r.final_pnl for r in results]),
+        max_drawdown=np.concatenate([r.max_drawdown for r in results]),
+        capital_usage=np.concatenate([r.capital_usage for r in results]),
+        initial_equity=results[0].initial_equity if results else 0.0
+    )
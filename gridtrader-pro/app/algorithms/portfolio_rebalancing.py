@@ -1,6 +1,9 @@
-from typing import List, Dict, Any
-from dataclasses import dataclass
+from typing import List, Dict, Any, Tuple, Optional
+from dataclasses import dataclass, field
 from decimal import Decimal
+import numpy as np
+
+from .rebalance_solver import TradingCosts, REBALANCE_MODES, solve_band_edge
 
 @dataclass
 class RebalanceAction:
@@ -15,12 +18,54 @@ class Portfolio:
     positions: Dict[str, float]  # symbol -> current_value
     allocation_targets: Dict[str, float]  # symbol -> target_percentage
     rebalance_bands: Dict[str, float]  # symbol -> band_percentage
+    min_percentages: Dict[str, float] = field(default_factory=dict)  # symbol -> min_percentage
+    max_percentages: Dict[str, float] = field(default_factory=dict)  # symbol -> max_percentage
+
+def net_trades(actions: List[RebalanceAction]) -> Tuple[List[RebalanceAction], float]:
+    """Net buys against sells on aggregate totals; returns (trades, netted turnover).
+
+    The smaller side cancels entirely against the larger one, and the
+    remaining surplus is carried by the largest trades on the larger side,
+    which gives the fewest orders. Netted turnover is the buy plus sell value
+    that no longer needs to be traded. The input actions are not modified.
+    """
+    buy_total = sum(a.value for a in actions if a.action == 'BUY')
+    sell_total = sum(a.value for a in actions if a.action == 'SELL')
+    
+    surplus_side = 'BUY' if buy_total > sell_total else 'SELL'
+    surplus = abs(buy_total - sell_total)
+    netted_turnover = 2 * min(buy_total, sell_total)
+    
+    trades = []
+    for action in sorted((a for a in actions if a.action == surplus_side), key=lambda a: a.value, reverse=True):
+        if surplus <= 0:
+            break
+        value = min(action.value, surplus)
+        trades.append(RebalanceAction(
+            symbol=action.symbol,
+            action=action.action,
+            value=value,
+            reason=action.reason
+        ))
+        surplus -= value
+    
+    return trades, netted_turnover
 
 class PortfolioRebalancer:
     def __init__(self, portfolio: Portfolio):
         self.portfolio = portfolio
+        self.netted_turnover = 0.0
+        self.estimated_costs = 0.0
     
-    def calculate_rebalance_actions(self) -> List[RebalanceAction]:
+    def calculate_rebalance_actions(self, mode: str = 'target',
+                                    costs: Optional[TradingCosts] = None) -> List[RebalanceAction]:
+        """``mode='target'`` trades out-of-band holdings back to target and nets the result;
+        ``mode='band_edge'`` runs the cost-aware minimum-turnover solver."""
+        if mode not in REBALANCE_MODES:
+            raise ValueError(f"Unknown rebalance mode: {mode}")
+        if mode == 'band_edge':
+            return self._band_edge_actions(costs or TradingCosts())
+        
         actions = []
         total_value = self.portfolio.total_value
         
@@ -49,43 +94,57 @@ class PortfolioRebalancer:
                     reason=f'Outside rebalance band by {deviation:.2%}'
                 ))
         
-        return self._optimize_trades(actions)
+        optimized_actions = self._optimize_trades(actions)
+        if costs is not None and optimized_actions:
+            rates = costs.cost_rates([a.symbol for a in optimized_actions])
+            values = np.array([a.value for a in optimized_actions], dtype=float)
+            self.estimated_costs = float((values * rates).sum() + costs.fixed_fee * len(optimized_actions))
+        
+        return optimized_actions
     
     def _optimize_trades(self, actions: List[RebalanceAction]) -> List[RebalanceAction]:
         """Optimize trades to minimize transaction costs"""
-        buys = [a for a in actions if a.action == 'BUY']
-        sells = [a for a in actions if a.action == 'SELL']
-        
-        # Sort by value to prioritize larger trades
-        buys.sort(key=lambda x: x.value, reverse=True)
-        sells.sort(key=lambda x: x.value, reverse=True)
+        optimized_actions, self.netted_turnover = net_trades(actions)
+        return optimized_actions
+    
+    def _band_edge_actions(self, costs: TradingCosts) -> List[RebalanceAction]:
+        """Trade only back to the band edges, within min/max percentages, funding buys at least cost"""
+        portfolio = self.portfolio
+        symbols = list(portfolio.allocation_targets)
+        total_value = portfolio.total_value
+        if total_value <= 0 or not symbols:
+            return []
         
-        # Net out positions where possible
-        optimized_actions = []
+        values = np.array([portfolio.positions.get(s, 0) for s in symbols], dtype=float)
+        solution = solve_band_edge(
+            values,
+            total_value,
+            [portfolio.allocation_targets[s] for s in symbols],
+            [portfolio.rebalance_bands.get(s, 5.0) for s in symbols],
+            costs.cost_rates(symbols),
+            min_percentages=[portfolio.min_percentages.get(s, 0.0) for s in symbols],
+            max_percentages=[portfolio.max_percentages.get(s, 100.0) for s in symbols],
+            fixed_fee=costs.fixed_fee,
+            cash=total_value - sum(portfolio.positions.values())
+        )
+        self.estimated_costs = solution.costs
         
-        for buy_action in buys:
-            remaining_buy_value = buy_action.value
-            
-            for sell_action in sells:
-                if sell_action.value > 0 and remaining_buy_value > 0:
-                    net_amount = min(sell_action.value, remaining_buy_value)
-                    sell_action.value -= net_amount
-                    remaining_buy_value -= net_amount
-            
-            if remaining_buy_value > 0:
-                optimized_actions.append(RebalanceAction(
-                    symbol=buy_action.symbol,
-                    action='BUY',
-                    value=remaining_buy_value,
-                    reason=buy_action.reason
-                ))
-        
-        # Add remaining sells
-        for sell_action in sells:
-            if sell_action.value > 0:
-                optimized_actions.append(sell_action)
+        actions = []
+        for i in np.flatnonzero(np.abs(solution.trades) > 1e-9).tolist():
+            trade = float(solution.trades[i])
+            if values[i] < solution.lower[i] or values[i] > solution.upper[i]:
+                edge = solution.lower[i] if trade > 0 else solution.upper[i]
+                reason = f'Outside rebalance band, trading to band edge {edge / total_value:.2%}'
+            else:
+                reason = 'Funds purchases within rebalance band'
+            actions.append(RebalanceAction(
+                symbol=symbols[i],
+                action='BUY' if trade > 0 else 'SELL',
+                value=abs(trade),
+                reason=reason
+            ))
         
-        return optimized_actions
+        return actions
     
     def calculate_portfolio_metrics(self) -> Dict[str, Any]:
         """Calculate portfolio risk and performance metrics"""
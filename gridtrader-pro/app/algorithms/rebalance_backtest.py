@@ -0,0 +1,173 @@
+from typing import List, Dict, Any, Optional, Union
+from dataclasses import dataclass
+import numpy as np
+
+REBALANCE_POLICIES = ('calendar', 'band', 'hybrid')
+TRADING_DAYS_PER_YEAR = 252
+
+# Days of drift evaluated per matrix step while searching for the next band breach
+_LOOKAHEAD = 252
+
+@dataclass
+class RebalanceBacktestResult:
+    policy: str
+    values: np.ndarray  # portfolio value per day
+    benchmark_values: np.ndarray  # daily-rebalanced target portfolio
+    rebalance_days: np.ndarray  # day indices of rebalances after the initial allocation
+    turnover: np.ndarray  # one-way traded fraction of portfolio value per rebalance
+    costs: np.ndarray  # cost paid per rebalance, in portfolio value
+    start_index: int = 0  # first input date used; earlier dates lacked a price for some symbol
+    
+    def summary(self) -> Dict[str, Any]:
+        days = len(self.values)
+        if days < 2:
+            return {'policy': self.policy, 'days': days, 'rebalances': 0}
+        
+        returns = self.values[1:] / self.values[:-1] - 1
+        benchmark_returns = self.benchmark_values[1:] / self.benchmark_values[:-1] - 1
+        active = returns - benchmark_returns
+        years = (days - 1) / TRADING_DAYS_PER_YEAR
+        
+        running_max = np.maximum.accumulate(self.values)
+        drawdown = (running_max - self.values) / running_max
+        total_return = self.values[-1] / self.values[0] - 1
+        
+        return {
+            'policy': self.policy,
+            'days': days,
+            'rebalances': len(self.rebalance_days),
+            'total_turnover_pct': float(self.turnover.sum() * 100),
+            'annual_turnover_pct': float(self.turnover.sum() / years * 100),
+            'total_costs': float(self.costs.sum()),
+            'total_return_pct': float(total_return * 100),
+            'annualized_return_pct': float(((1 + total_return) ** (1 / years) - 1) * 100),
+            'benchmark_return_pct': float((self.benchmark_values[-1] / self.benchmark_values[0] - 1) * 100),
+            'tracking_error_pct': float(active.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR) * 100) if len(active) > 1 else 0.0,
+            'volatility_pct': float(returns.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR) * 100) if len(returns) > 1 else 0.0,
+            'max_drawdown_pct': float(drawdown.max() * 100)
+        }
+
+def _forward_fill(close: np.ndarray) -> np.ndarray:
+    """Carry the last known price forward along the date axis (rows)"""
+    valid = ~np.isnan(close)
+    last = np.where(valid, np.arange(len(close))[:, None], 0)
+    np.maximum.accumulate(last, axis=0, out=last)
+    return close[last, np.arange(close.shape[1])]
+
+def backtest_rebalancing(close, target_weights, policy: str = 'band', frequency: int = 21,
+                         bands: Union[float, np.ndarray] = 5.0, cost_rate: float = 0.0,
+                         initial_value: float = 1.0) -> RebalanceBacktestResult:
+    """Replay a target allocation over historical closes under a rebalancing policy.
+
+    ``close`` is a (symbols, dates) matrix as returned by ``load_ohlc_matrix``;
+    gaps are forward-filled and dates before every symbol has a price are
+    dropped. ``target_weights`` and ``bands`` are in percent, per symbol;
+    any unallocated remainder is held as cash. Policies:
+
+    - ``calendar``: rebalance every ``frequency`` days
+    - ``band``: rebalance on the first day any weight is outside its band
+    - ``hybrid``: check the bands every ``frequency`` days only
+
+    Between rebalances, drifted weights come from the cumulative-return
+    matrix relative to the last rebalance, so the search for the next
+    rebalance is one matrix operation per window rather than a daily loop.
+    ``cost_rate`` is charged on the value traded.
+    """
+    if policy not in REBALANCE_POLICIES:
+        raise ValueError(f"Unknown rebalance policy: {policy}")
+    if frequency < 1:
+        raise ValueError("frequency must be at least 1")
+    
+    prices = _forward_fill(np.asarray(close, dtype=float).T)
+    start = int(np.argmax(~np.isnan(prices).any(axis=1))) if len(prices) else 0
+    prices = prices[start:]
+    if len(prices) == 0 or np.isnan(prices[0]).any():
+        raise ValueError("No date with prices for every symbol")
+    
+    weights = np.asarray(target_weights, dtype=float) / 100
+    cash_weight = 1 - weights.sum()
+    if cash_weight < -1e-9:
+        raise ValueError("Target weights add up to more than 100%")
+    # Cash is an extra asset with a constant price
+    prices = np.hstack((prices, np.ones((len(prices), 1))))
+    target = np.append(weights, max(cash_weight, 0.0))
+    band = np.append(np.broadcast_to(np.asarray(bands, dtype=float) / 100, weights.shape), np.inf)
+    
+    num_days = len(prices)
+    day_numbers = np.arange(num_days)
+    values = np.empty(num_days)
+    values[0] = initial_value
+    rebalance_days, turnover, costs = [], [], []
+    
+    r = 0
+    while r < num_days - 1:
+        next_r = num_days
+        window_start = r + 1
+        while window_start < num_days:
+            window_stop = min(window_start + _LOOKAHEAD, num_days)
+            if policy == 'calendar':
+                window_stop = min(window_stop, r + frequency + 1)
+            
+            growth = prices[window_start:window_stop] / prices[r]
+            gross = growth @ target
+            values[window_start:window_stop] = values[r] * gross
+            
+            if policy == 'calendar':
+                due = day_numbers[window_start:window_stop] == r + frequency
+            else:
+                drifted = growth * target / gross[:, None]
+                due = (np.abs(drifted - target) > band).any(axis=1)
+                if policy == 'hybrid':
+                    due &= day_numbers[window_start:window_stop] % frequency == 0
+            
+            if due.any():
+                next_r = window_start + int(np.argmax(due))
+                break
+            window_start = window_stop
+        
+        if next_r >= num_days:
+            break
+        
+        growth = prices[next_r] / prices[r]
+        drifted = growth * target / (growth @ target)
+        traded = np.abs(drifted - target).sum()
+        cost = values[next_r] * traded * cost_rate
+        values[next_r] -= cost
+        # The value path after next_r restarts from the post-cost value on the next pass
+        
+        rebalance_days.append(next_r)
+        turnover.append(traded / 2)
+        costs.append(cost)
+        r = next_r
+    
+    daily = prices[1:] / prices[:-1] - 1
+    benchmark = initial_value * np.concatenate(([1.0], np.cumprod(1 + daily @ target)))
+    
+    return RebalanceBacktestResult(
+        policy=policy,
+        values=values,
+        benchmark_values=benchmark,
+        rebalance_days=np.array(rebalance_days, dtype=np.intp),
+        turnover=np.array(turnover, dtype=float),
+        costs=np.array(costs, dtype=float),
+        start_index=start
+    )
+
+def compare_policies(close, target_weights, band_widths: List[float], frequency: int = 21,
+                     cost_rate: float = 0.0, bands: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    """Summaries for the calendar policy and for band and hybrid policies at each band width.
+
+    ``bands`` gives per-symbol bands for one extra band and hybrid run, as
+    configured in ``rebalance_bands``.
+    """
+    runs = [('calendar', 5.0, None)]
+    runs += [(policy, width, width) for width in band_widths for policy in ('band', 'hybrid')]
+    if bands is not None:
+        runs += [(policy, bands, 'configured') for policy in ('band', 'hybrid')]
+    
+    summaries = []
+    for policy, policy_bands, label in runs:
+        summary = backtest_rebalancing(close, target_weights, policy, frequency, policy_bands, cost_rate).summary()
+        summary['band'] = label
+        summaries.append(summary)
+    return summaries
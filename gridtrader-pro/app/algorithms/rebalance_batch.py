@@ -0,0 +1,200 @@
+from typing import List, Dict, Iterable, Optional, Tuple
+from dataclasses import dataclass
+import numpy as np
+
+from .portfolio_rebalancing import Portfolio, RebalanceAction, net_trades
+
+DEFAULT_BAND = 5.0
+
+def _range_indices(starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+    """Concatenated ``arange(start, stop)`` for each range, without a Python loop"""
+    counts = stops - starts
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + offsets
+
+@dataclass
+class BatchRebalanceResult:
+    """Band check results per (portfolio, symbol) cell, aligned with the rebalancer's cells"""
+    portfolio_ids: List[str]
+    symbols: List[str]
+    total_values: np.ndarray
+    rows: np.ndarray           # portfolio row of each cell
+    cols: np.ndarray           # symbol column of each cell
+    row_offsets: np.ndarray    # cells of row r are row_offsets[r]:row_offsets[r + 1]
+    weights: np.ndarray        # current weights, 0 where the portfolio has no value
+    deviations: np.ndarray     # current - target weight, NaN where the symbol has no target
+    breaches: np.ndarray       # |deviation| > band
+    trade_values: np.ndarray   # signed trade back to target: > 0 buy, < 0 sell, 0 inside the band
+    
+    def _per_portfolio(self, cell_values) -> np.ndarray:
+        return np.bincount(self.rows, weights=cell_values, minlength=len(self.portfolio_ids))
+    
+    @property
+    def needs_rebalancing(self) -> np.ndarray:
+        return self._per_portfolio(self.breaches) > 0
+    
+    def actions(self, row: int) -> List[RebalanceAction]:
+        """Unnetted RebalanceActions for one portfolio row, in symbol order"""
+        cells = np.arange(self.row_offsets[row], self.row_offsets[row + 1])
+        cells = cells[self.breaches[cells]]
+        return [
+            RebalanceAction(
+                symbol=self.symbols[col],
+                action='BUY' if trade > 0 else 'SELL',
+                value=abs(trade),
+                reason=f'Outside rebalance band by {abs(deviation):.2%}'
+            )
+            for col, trade, deviation in zip(
+                self.cols[cells].tolist(),
+                self.trade_values[cells].tolist(),
+                self.deviations[cells].tolist()
+            )
+        ]
+    
+    @property
+    def netted_turnover(self) -> np.ndarray:
+        """Per-portfolio buy plus sell value that netting removes"""
+        buys = self._per_portfolio(np.maximum(self.trade_values, 0.0))
+        sells = self._per_portfolio(np.maximum(-self.trade_values, 0.0))
+        return 2 * np.minimum(buys, sells)
+    
+    def to_actions(self) -> Dict[str, List[RebalanceAction]]:
+        """Unnetted actions for every portfolio that needs rebalancing"""
+        return {
+            self.portfolio_ids[row]: self.actions(row)
+            for row in np.flatnonzero(self.needs_rebalancing).tolist()
+        }
+    
+    def netted_actions(self) -> Dict[str, List[RebalanceAction]]:
+        """Actions after ``net_trades``, as ``PortfolioRebalancer`` returns them"""
+        return {pid: net_trades(actions)[0] for pid, actions in self.to_actions().items()}
+
+class BatchRebalancer:
+    """Band checks for many portfolios at once.
+
+    Inputs are sparse: one entry per (portfolio, symbol) cell that is held
+    or targeted, as parallel ``rows``/``cols``/value arrays sorted by row
+    and then column (CSR order), so memory grows with the number of
+    holdings rather than portfolios x symbols. Values and targets are in
+    the units of ``Portfolio``; untargeted cells hold NaN in
+    ``target_weights`` and are never traded, matching ``PortfolioRebalancer``,
+    which only looks at symbols that have a target.
+    """
+    
+    def __init__(self, portfolio_ids: List[str], symbols: List[str], rows, cols, positions, target_weights,
+                 bands=DEFAULT_BAND, total_values=None):
+        self.portfolio_ids = list(portfolio_ids)
+        self.symbols = list(symbols)
+        rows = np.asarray(rows, dtype=np.intp)
+        cols = np.asarray(cols, dtype=np.intp)
+        order = np.lexsort((cols, rows))
+        
+        self.rows = rows[order]
+        self.cols = cols[order]
+        self.positions = np.asarray(positions, dtype=float)[order]
+        self.target_weights = np.asarray(target_weights, dtype=float)[order]
+        self.bands = np.broadcast_to(np.asarray(bands, dtype=float), rows.shape)[order]
+        self.row_offsets = np.searchsorted(self.rows, np.arange(len(self.portfolio_ids) + 1))
+        self.total_values = np.bincount(self.rows, weights=self.positions, minlength=len(self.portfolio_ids)) \
+            if total_values is None else np.asarray(total_values, dtype=float)
+    
+    @classmethod
+    def from_records(cls, positions: Iterable[Tuple[str, str, float]],
+                     targets: Iterable[Tuple[str, str, float, Optional[float]]],
+                     total_values: Optional[Dict[str, float]] = None) -> 'BatchRebalancer':
+        """Build from sparse ``(portfolio_id, symbol, value)`` and
+        ``(portfolio_id, symbol, target_pct, band_pct)`` records.
+
+        Repeated position records are summed. A missing band falls back to
+        ``DEFAULT_BAND``; portfolios missing from ``total_values`` use the
+        sum of their positions.
+        """
+        positions = list(positions)
+        targets = list(targets)
+        
+        portfolio_ids = list(dict.fromkeys(
+            [p[0] for p in positions] + [t[0] for t in targets] + list(total_values or ())
+        ))
+        symbols = sorted({p[1] for p in positions} | {t[1] for t in targets})
+        row_of = {pid: i for i, pid in enumerate(portfolio_ids)}
+        col_of = {s: j for j, s in enumerate(symbols)}
+        
+        # One cell per distinct (row, col) key across both record sets
+        position_keys = np.array([row_of[p[0]] * len(symbols) + col_of[p[1]] for p in positions], dtype=np.intp)
+        target_keys = np.array([row_of[t[0]] * len(symbols) + col_of[t[1]] for t in targets], dtype=np.intp)
+        keys, inverse = np.unique(np.concatenate((position_keys, target_keys)), return_inverse=True)
+        position_cells, target_cells = inverse[:len(positions)], inverse[len(positions):]
+        
+        values = np.bincount(position_cells, weights=np.array([float(p[2]) for p in positions]),
+                             minlength=len(keys)) if positions else np.zeros(len(keys))
+        target_weights = np.full(len(keys), np.nan)
+        bands = np.full(len(keys), DEFAULT_BAND)
+        for cell, (_, _, target_pct, band_pct) in zip(target_cells.tolist(), targets):
+            target_weights[cell] = float(target_pct)
+            if band_pct is not None:
+                bands[cell] = float(band_pct)
+        
+        rows, cols = np.divmod(keys, max(len(symbols), 1))
+        totals = np.bincount(rows, weights=values, minlength=len(portfolio_ids))
+        for pid, value in (total_values or {}).items():
+            if value is not None:
+                totals[row_of[pid]] = float(value)
+        
+        return cls(portfolio_ids, symbols, rows, cols, values, target_weights, bands, totals)
+    
+    @classmethod
+    def from_portfolios(cls, portfolios: Dict[str, Portfolio]) -> 'BatchRebalancer':
+        return cls.from_records(
+            [(pid, s, v) for pid, p in portfolios.items() for s, v in p.positions.items()],
+            [(pid, s, t, p.rebalance_bands.get(s)) for pid, p in portfolios.items()
+             for s, t in p.allocation_targets.items()],
+            {pid: p.total_value for pid, p in portfolios.items()}
+        )
+    
+    def cell_indices(self, rows: np.ndarray) -> np.ndarray:
+        """Indices of every cell of the given portfolio rows, row by row"""
+        rows = np.asarray(rows, dtype=np.intp)
+        return _range_indices(self.row_offsets[rows], self.row_offsets[rows + 1])
+    
+    def subset(self, rows: np.ndarray, positions=None, total_values=None) -> 'BatchRebalancer':
+        """Rebalancer over some portfolio rows, optionally with new cell values (aligned with
+        ``cell_indices(rows)``) and totals"""
+        rows = np.asarray(rows, dtype=np.intp)
+        cells = self.cell_indices(rows)
+        counts = self.row_offsets[rows + 1] - self.row_offsets[rows]
+        return BatchRebalancer(
+            [self.portfolio_ids[r] for r in rows.tolist()],
+            self.symbols,
+            np.repeat(np.arange(len(rows)), counts),
+            self.cols[cells],
+            self.positions[cells] if positions is None else positions,
+            self.target_weights[cells],
+            self.bands[cells],
+            self.total_values[rows] if total_values is None else total_values
+        )
+    
+    def calculate(self) -> BatchRebalanceResult:
+        """Deviations, band breaches and trade values for every cell in one pass"""
+        totals = self.total_values[self.rows]
+        has_value = totals > 0
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weights = np.where(has_value, self.positions / totals, 0.0)
+        
+        deviations = weights - self.target_weights / 100
+        # NaN deviations (untargeted cells) compare False
+        breaches = np.abs(deviations) > self.bands / 100
+        trade_values = np.where(breaches, totals * self.target_weights / 100 - self.positions, 0.0)
+        
+        return BatchRebalanceResult(
+            portfolio_ids=self.portfolio_ids,
+            symbols=self.symbols,
+            total_values=self.total_values,
+            rows=self.rows,
+            cols=self.cols,
+            row_offsets=self.row_offsets,
+            weights=weights,
+            deviations=deviations,
+            breaches=breaches,
+            trade_values=trade_values
+        )
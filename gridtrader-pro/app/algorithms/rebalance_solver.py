@@ -0,0 +1,85 @@
+from typing import Dict, Optional
+from dataclasses import dataclass, field
+import numpy as np
+
+REBALANCE_MODES = ('target', 'band_edge')
+
+@dataclass
+class TradingCosts:
+    fee_rate: float = 0.0  # commission as a fraction of traded value
+    spread: float = 0.0  # default bid-ask spread as a fraction of price; half is paid per trade
+    fixed_fee: float = 0.0  # per order
+    spreads: Dict[str, float] = field(default_factory=dict)  # symbol -> spread override
+    
+    def cost_rates(self, symbols) -> np.ndarray:
+        """Proportional cost per unit traded for each symbol"""
+        return np.array([self.fee_rate + self.spreads.get(s, self.spread) / 2 for s in symbols], dtype=float)
+
+@dataclass
+class BandEdgeSolution:
+    trades: np.ndarray  # signed trade values: > 0 buy, < 0 sell
+    funding_sells: np.ndarray  # part of the sells taken only to pay for buys
+    lower: np.ndarray  # band edges as values
+    upper: np.ndarray
+    turnover: float
+    costs: float
+
+def solve_band_edge(values, total_value: float, targets, bands, cost_rates,
+                    min_percentages=None, max_percentages=None, fixed_fee: float = 0.0,
+                    cash: Optional[float] = None) -> BandEdgeSolution:
+    """Minimum-turnover rebalance that only pulls holdings back to their band edge.
+
+    Every array is aligned per symbol; targets, bands and limits are in
+    percent. The allowed range is the band around the target, clipped to
+    ``[min_percentages, max_percentages]``. Holdings above it are sold down
+    to the upper edge and holdings below it bought up to the lower edge.
+    Buys plus their costs must be paid for by sale proceeds after costs plus
+    ``cash`` (the untracked part of ``total_value`` if omitted). Any shortfall
+    is covered greedily by selling the cheapest-to-trade holdings down to
+    their lower edge; what still cannot be funded scales the buys down.
+    """
+    values = np.asarray(values, dtype=float)
+    targets = np.asarray(targets, dtype=float)
+    bands = np.broadcast_to(np.asarray(bands, dtype=float), values.shape)
+    cost_rates = np.broadcast_to(np.asarray(cost_rates, dtype=float), values.shape)
+    min_pct = np.zeros_like(values) if min_percentages is None else np.asarray(min_percentages, dtype=float)
+    max_pct = np.full_like(values, 100.0) if max_percentages is None else np.asarray(max_percentages, dtype=float)
+    
+    lower = np.maximum(targets - bands, min_pct) / 100 * total_value
+    upper = np.maximum(np.minimum(targets + bands, max_pct) / 100 * total_value, lower)
+    
+    buys = np.maximum(lower - values, 0.0)
+    sells = np.maximum(values - upper, 0.0)
+    
+    if cash is None:
+        cash = total_value - values.sum()
+    deficit = (buys * (1 + cost_rates)).sum() - (sells * (1 - cost_rates)).sum() - max(cash, 0.0)
+    
+    funding = np.zeros_like(values)
+    if deficit > 0:
+        # Room to sell without leaving the band, cheapest holdings first, larger room breaking ties
+        room = np.where(buys > 0, 0.0, np.maximum(values - sells - lower, 0.0))
+        order = np.lexsort((-room, cost_rates))
+        proceeds = (room * (1 - cost_rates))[order]
+        before = np.cumsum(proceeds) - proceeds
+        taken = np.clip(deficit - before, 0.0, proceeds)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            funding[order] = np.where(proceeds > 0, taken / (1 - cost_rates[order]), 0.0)
+        deficit -= taken.sum()
+    
+    if deficit > 1e-9:
+        # Not enough room left anywhere: buy only what the proceeds can pay for
+        buy_cost = (buys * (1 + cost_rates)).sum()
+        buys *= max(buy_cost - deficit, 0.0) / buy_cost
+    
+    trades = buys - sells - funding
+    traded = np.abs(trades)
+    
+    return BandEdgeSolution(
+        trades=trades,
+        funding_sells=funding,
+        lower=lower,
+        upper=upper,
+        turnover=float(traded.sum()),
+        costs=float((traded * cost_rates).sum() + fixed_fee * np.count_nonzero(traded))
+    )
@@ -0,0 +1,157 @@
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from dataclasses import dataclass
+import numpy as np
+
+from .portfolio_rebalancing import Portfolio, RebalanceAction
+
+UNCLASSIFIED = 'Unclassified'
+
+class SectorMap:
+    """Symbol -> sector lookup with integer sector codes for vectorized roll-ups"""
+    
+    def __init__(self, sectors: Dict[str, Optional[str]]):
+        self.sector_names = sorted({s for s in sectors.values() if s} | {UNCLASSIFIED})
+        self._code_of = {name: code for code, name in enumerate(self.sector_names)}
+        self._symbol_codes = {symbol.upper(): self._code_of[sector or UNCLASSIFIED]
+                              for symbol, sector in sectors.items()}
+    
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[str, Optional[str]]]) -> 'SectorMap':
+        return cls(dict(pairs))
+    
+    def __len__(self):
+        return len(self._symbol_codes)
+    
+    def sector_code(self, sector: str) -> Optional[int]:
+        return self._code_of.get(sector)
+    
+    def codes(self, symbols: Iterable[str]) -> np.ndarray:
+        """Sector code per symbol; unknown symbols are unclassified"""
+        unclassified = self._code_of[UNCLASSIFIED]
+        return np.array([self._symbol_codes.get(s.upper(), unclassified) for s in symbols], dtype=np.intp)
+    
+    def group_sums(self, values, codes: np.ndarray) -> np.ndarray:
+        """Sum values per sector code, aligned with ``sector_names``"""
+        return np.bincount(codes, weights=np.asarray(values, dtype=float), minlength=len(self.sector_names))
+
+@dataclass
+class SectorTarget:
+    target_percentage: float
+    rebalance_band: float = 5.0
+
+class HierarchicalRebalancer:
+    """Sector budgets first, then the symbols within each sector.
+
+    A sector outside its band is traded back to its budget as a whole, split
+    across its symbols by their targets scaled to what is left of the budget
+    after its untargeted holdings (or pro rata to current holdings when none
+    of them has a target). Symbols in sectors that
+    are within their band, or that have no budget, get the usual symbol-level
+    band check against those scaled targets.
+    """
+    
+    def __init__(self, portfolio: Portfolio, sector_map: SectorMap, sector_targets: Dict[str, SectorTarget]):
+        self.portfolio = portfolio
+        self.sector_map = sector_map
+        self.sector_targets = sector_targets
+        
+        self.symbols = list(dict.fromkeys(list(portfolio.positions) + list(portfolio.allocation_targets)))
+        self.codes = sector_map.codes(self.symbols)
+        self.values = np.array([portfolio.positions.get(s, 0) for s in self.symbols], dtype=float)
+        self.targets = np.array([portfolio.allocation_targets.get(s, np.nan) for s in self.symbols], dtype=float)
+        self.bands = np.array([portfolio.rebalance_bands.get(s, 5.0) for s in self.symbols], dtype=float)
+        
+        num_sectors = len(sector_map.sector_names)
+        self.sector_budgets = np.full(num_sectors, np.nan)
+        self.sector_bands = np.full(num_sectors, 5.0)
+        for name, target in sector_targets.items():
+            code = sector_map.sector_code(name)
+            if code is not None:
+                self.sector_budgets[code] = target.target_percentage
+                self.sector_bands[code] = target.rebalance_band
+    
+    def _sector_weights(self) -> np.ndarray:
+        total_value = self.portfolio.total_value
+        if total_value <= 0:
+            return np.zeros(len(self.sector_budgets))
+        return self.sector_map.group_sums(self.values, self.codes) / total_value
+    
+    def sector_breaches(self) -> np.ndarray:
+        deviations = self._sector_weights() - self.sector_budgets / 100
+        return np.abs(deviations) > self.sector_bands / 100
+    
+    def effective_targets(self) -> np.ndarray:
+        """Symbol targets in percent of the portfolio after applying sector budgets; NaN where untraded"""
+        targeted = ~np.isnan(self.targets)
+        sector_target_sums = self.sector_map.group_sums(np.where(targeted, self.targets, 0.0), self.codes)
+        sector_values = self.sector_map.group_sums(self.values, self.codes)
+        untargeted_values = self.sector_map.group_sums(np.where(targeted, 0.0, self.values), self.codes)
+        sector_counts = np.bincount(self.codes, minlength=len(self.sector_budgets))
+        
+        budgets = self.sector_budgets[self.codes]
+        has_budget = ~np.isnan(budgets)
+        any_targeted = sector_target_sums[self.codes] > 0
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            untargeted_pct = untargeted_values[self.codes] / self.portfolio.total_value * 100
+            remaining = np.maximum(budgets - untargeted_pct, 0.0)
+            scaled = self.targets * remaining / sector_target_sums[self.codes]
+            pro_rata = np.where(
+                sector_values[self.codes] > 0,
+                budgets * self.values / sector_values[self.codes],
+                budgets / sector_counts[self.codes]
+            )
+        
+        return np.where(
+            has_budget,
+            np.where(any_targeted, np.where(targeted, scaled, np.nan), pro_rata),
+            self.targets
+        )
+    
+    def sector_allocations(self) -> List[Dict[str, Any]]:
+        weights = self._sector_weights()
+        breaches = self.sector_breaches()
+        present = np.bincount(self.codes, minlength=len(weights)) > 0
+        return [
+            {
+                'sector': name,
+                'current_pct': float(weights[code] * 100),
+                'target_pct': None if np.isnan(self.sector_budgets[code]) else float(self.sector_budgets[code]),
+                'rebalance_band': float(self.sector_bands[code]),
+                'needs_rebalancing': bool(breaches[code])
+            }
+            for code, name in enumerate(self.sector_map.sector_names)
+            if present[code] or not np.isnan(self.sector_budgets[code])
+        ]
+    
+    def calculate_rebalance_actions(self) -> List[RebalanceAction]:
+        total_value = self.portfolio.total_value
+        if total_value <= 0:
+            return []
+        
+        effective = self.effective_targets()
+        weights = self.values / total_value
+        deviations = weights - effective / 100
+        
+        sector_breached = self.sector_breaches()[self.codes]
+        sector_deviations = (self._sector_weights() - self.sector_budgets / 100)[self.codes]
+        symbol_breached = np.abs(deviations) > self.bands / 100
+        trade = (sector_breached | symbol_breached) & ~np.isnan(effective)
+        trade_values = total_value * effective / 100 - self.values
+        
+        actions = []
+        for i in np.flatnonzero(trade & (trade_values != 0)).tolist():
+            if sector_breached[i]:
+                sector = self.sector_map.sector_names[self.codes[i]]
+                reason = f'Sector {sector} outside rebalance band by {abs(sector_deviations[i]):.2%}'
+            else:
+                reason = f'Outside rebalance band by {abs(deviations[i]):.2%}'
+            actions.append(RebalanceAction(
+                symbol=self.symbols[i],
+                action='BUY' if trade_values[i] > 0 else 'SELL',
+                value=float(abs(trade_values[i])),
+                reason=reason
+            ))
+        
+        # Not netted: moving budget between sectors needs both the buys and the sells
+        return actions
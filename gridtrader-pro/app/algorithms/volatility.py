@@ -0,0 +1,59 @@
+from typing import Tuple
+import numpy as np
+
+def _rolling_sums(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Trailing-window sum, sum of squares and count of non-NaN values along the last axis"""
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    
+    def _trailing(x):
+        c = np.cumsum(x, axis=-1)
+        c[..., window:] = c[..., window:] - c[..., :-window]
+        return c
+    
+    return _trailing(filled), _trailing(filled * filled), _trailing(valid.astype(float))
+
+def rolling_volatility(close: np.ndarray, window: int = 20, min_periods: int = None) -> np.ndarray:
+    """Rolling standard deviation of daily log returns.
+
+    ``close`` is (symbols, dates) with NaN for missing bars; the result has the
+    same shape. Values are per-bar (not annualized) and NaN until
+    ``min_periods`` returns are available.
+    """
+    close = np.asarray(close, dtype=float)
+    min_periods = window if min_periods is None else min_periods
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.full(close.shape, np.nan)
+        returns[..., 1:] = np.log(close[..., 1:] / close[..., :-1])
+        
+        total, total_sq, count = _rolling_sums(returns, window)
+        variance = (total_sq - total * total / count) / (count - 1)
+    
+    return np.where(count >= max(min_periods, 2), np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+def average_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                       window: int = 14, min_periods: int = None) -> np.ndarray:
+    """Simple moving average of the true range over (symbols, dates) matrices"""
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    min_periods = window if min_periods is None else min_periods
+    
+    prev_close = np.full(close.shape, np.nan)
+    prev_close[..., 1:] = close[..., :-1]
+    
+    # fmax ignores a missing previous close on the first bar
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    
+    total, _, count = _rolling_sums(true_range, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(count >= min_periods, total / count, np.nan)
+
+def latest_valid(values: np.ndarray) -> np.ndarray:
+    """Last non-NaN value along the last axis (NaN where a row has none)"""
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    last = values.shape[-1] - 1 - np.argmax(valid[..., ::-1], axis=-1)
+    result = np.take_along_axis(values, last[..., None], axis=-1)[..., 0]
+    return np.where(valid.any(axis=-1), result, np.nan)
@@ -0,0 +1,141 @@
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from concurrent.futures import Executor, ProcessPoolExecutor
+import itertools
+import os
+import numpy as np
+
+from . import grid_optimizer
+from .grid_backtest import OHLCSeries, backtest_grid
+from .grid_optimizer import SharedPrices, parameter_grid, sweep_grid_parameters
+
+@dataclass
+class WalkForwardWindow:
+    in_sample: Tuple[int, int]  # bar range [start, stop)
+    out_of_sample: Tuple[int, int]
+    best_params: Dict[str, Any]
+    in_sample_score: float
+    out_of_sample_summary: Dict[str, Any]
+    out_of_sample_equity: np.ndarray  # normalized to 1.0 at the window start
+
+@dataclass
+class WalkForwardResult:
+    windows: List[WalkForwardWindow]
+    stitched_equity: np.ndarray  # out-of-sample segments chained together, starting at 1.0
+
+    def summary(self) -> Dict[str, Any]:
+        equity = self.stitched_equity
+        running_max = np.maximum.accumulate(equity)
+        
+        return {
+            'windows': len(self.windows),
+            'out_of_sample_bars': len(equity) - 1,
+            'total_return_pct': float((equity[-1] - 1) * 100),
+            'max_drawdown_pct': float(((running_max - equity) / running_max).max() * 100),
+            'profitable_windows': sum(1 for w in self.windows if w.out_of_sample_equity[-1] > 1),
+            'window_results': [
+                {
+                    'in_sample': w.in_sample,
+                    'out_of_sample': w.out_of_sample,
+                    'best_params': w.best_params,
+                    'in_sample_score': w.in_sample_score,
+                    'out_of_sample_return_pct': w.out_of_sample_summary.get('total_return_pct', 0)
+                }
+                for w in self.windows
+            ]
+        }
+
+def walk_forward_windows(num_bars: int, in_sample_bars: int, out_of_sample_bars: int,
+                         step: Optional[int] = None) -> List[Tuple[int, int, int]]:
+    """Rolling (in-sample start, in-sample stop, out-of-sample stop) bar indices"""
+    step = step or out_of_sample_bars
+    return [
+        (start, start + in_sample_bars, min(start + in_sample_bars + out_of_sample_bars, num_bars))
+        for start in range(0, num_bars - in_sample_bars, step)
+    ]
+
+def _evaluate_window(prices: OHLCSeries, window: Tuple[int, int, int], symbol: str,
+                     param_lists: Tuple[Sequence, ...], grid_type: str, rank_by: str) -> WalkForwardWindow:
+    is_start, is_stop, oos_stop = window
+    
+    # Slices are views into the one loaded array
+    in_sample = prices.slice(is_start, is_stop)
+    out_of_sample = prices.slice(is_stop, oos_stop)
+    
+    # Each window anchors its grids at the price it starts from
+    configs = parameter_grid(symbol, float(in_sample.open[0]), *param_lists, grid_type=grid_type)
+    best = sweep_grid_parameters(configs, in_sample, rank_by=rank_by, max_workers=1)[0]
+    best_params = {k: best[k] for k in ('grid_spacing', 'num_grids_up', 'num_grids_down', 'position_size')}
+    
+    oos_config = parameter_grid(
+        symbol, float(in_sample.close[-1]),
+        [best_params['grid_spacing']], [best_params['num_grids_up']],
+        [best_params['num_grids_down']], [best_params['position_size']],
+        grid_type=grid_type
+    )[0]
+    result = backtest_grid(oos_config, out_of_sample)
+    summary = result.summary()
+    summary.pop('cycles_by_level', None)
+    # A grid with nothing to fill has no equity to normalize; treat it as flat
+    equity = result.equity / result.initial_equity if result.initial_equity > 0 else np.ones(len(result.equity))
+    
+    return WalkForwardWindow(
+        in_sample=(is_start, is_stop),
+        out_of_sample=(is_stop, oos_stop),
+        best_params=best_params,
+        in_sample_score=float(best.get(rank_by, float('nan'))),
+        out_of_sample_summary=summary,
+        out_of_sample_equity=np.concatenate(([1.0], equity))
+    )
+
+def _run_window(shm_name: str, shape: Tuple[int, int], window: Tuple[int, int, int], symbol: str, param_lists: Tuple[Sequence, ...],
+                grid_type: str, rank_by: str) -> WalkForwardWindow:
+    return _evaluate_window(grid_optimizer.worker_prices(shm_name, shape), window, symbol, param_lists, grid_type, rank_by)
+
+def walk_forward(prices: OHLCSeries, symbol: str, grid_spacings: Sequence[float],
+                 num_grids_up: Sequence[int], num_grids_down: Sequence[int],
+                 position_sizes: Sequence[float], in_sample_bars: int = 252,
+                 out_of_sample_bars: int = 63, step: Optional[int] = None,
+                 grid_type: str = "percentage", rank_by: str = 'total_return_pct',
+                 max_workers: Optional[int] = None, executor: Optional[Executor] = None) -> WalkForwardResult:
+    """Optimize grid parameters on rolling in-sample windows and test them out of sample.
+
+    Windows run in parallel on a process pool (``executor`` if given) that
+    maps the price arrays from shared memory; each window works on
+    zero-copy slices of them.
+    """
+    windows = walk_forward_windows(len(prices), in_sample_bars, out_of_sample_bars, step)
+    param_lists = (grid_spacings, num_grids_up, num_grids_down, position_sizes)
+    
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    
+    if max_workers <= 1 or len(windows) <= 1:
+        results = [_evaluate_window(prices, w, symbol, param_lists, grid_type, rank_by) for w in windows]
+    else:
+        with SharedPrices(prices) as shared:
+            pool = executor or ProcessPoolExecutor(max_workers=min(max_workers, len(windows)))
+            try:
+                results = list(pool.map(
+                    _run_window, itertools.repeat(shared.name), itertools.repeat(shared.shape),
+                    windows, itertools.repeat(symbol), itertools.repeat(param_lists),
+                    itertools.repeat(grid_type), itertools.repeat(rank_by)
+                ))
+            finally:
+                if executor is None:
+                    pool.shutdown()
+    
+    # Chain out-of-sample segments; with step < out_of_sample_bars segments overlap,
+    # so only the bars up to the next window's start are used
+    stitched = [np.ones(1)]
+    level = 1.0
+    for i, window in enumerate(results):
+        stop = window.out_of_sample[1]
+        if i + 1 < len(results):
+            stop = min(stop, results[i + 1].out_of_sample[0])
+        segment = window.out_of_sample_equity[1:stop - window.out_of_sample[0] + 1]
+        stitched.append(level * segment)
+        if len(segment):
+            level *= segment[-1]
+    
+    return WalkForwardResult(windows=results, stitched_equity=np.concatenate(stitched))
@@ -0,0 +1,27 @@
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+import threading
+import os
+
+# One process pool per API process, shared by every CPU-bound request
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_worker_pool() -> ProcessPoolExecutor:
+    """Lazily started process pool with one worker per CPU.
+
+    Requests submit their chunks to this pool instead of starting their own,
+    so concurrent sweeps and simulations queue for the same workers.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _pool
+
+def shutdown_worker_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
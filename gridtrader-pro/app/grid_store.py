@@ -0,0 +1,138 @@
+from typing import Dict, List, Iterable, Optional
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import GridConfigs, GridLevels
+from .algorithms.grid_trading import (
+    GridTradingEngine, GridConfig, GridLevel, LevelTransition, ACTION_CODES, price_to_decimal
+)
+
+def _engine_from_rows(grid_config: GridConfigs, grid_levels: Iterable[GridLevels]) -> GridTradingEngine:
+    grid_levels = list(grid_levels)
+    config = GridConfig(
+        symbol=grid_config.symbol,
+        base_price=float(grid_config.base_price),
+        grid_spacing=float(grid_config.grid_spacing),
+        num_grids_up=grid_config.num_grids_up,
+        num_grids_down=grid_config.num_grids_down,
+        position_size=float(grid_config.position_size),
+        grid_type=grid_config.grid_type
+    )
+    
+    return GridTradingEngine.from_arrays(
+        config,
+        [l.level_number for l in grid_levels],
+        [float(l.trigger_price) for l in grid_levels],
+        [ACTION_CODES['BUY'] if l.level_number < 0 else ACTION_CODES['SELL'] for l in grid_levels],
+        [float(l.target_allocation) for l in grid_levels],
+        [bool(l.is_filled) for l in grid_levels],
+        [float(l.filled_price) if l.filled_price is not None else float('nan') for l in grid_levels],
+        [float(l.filled_quantity) if l.filled_quantity is not None else float('nan') for l in grid_levels]
+    )
+
+def load_engine(db: Session, grid_config: GridConfigs) -> GridTradingEngine:
+    """Rebuild a compact engine from a GridConfigs row and its GridLevels rows"""
+    grid_levels = db.query(GridLevels).filter(
+        GridLevels.grid_config_id == grid_config.id
+    ).order_by(GridLevels.level_number).all()
+    
+    return _engine_from_rows(grid_config, grid_levels)
+
+def touch_grid_configs(db: Session, grid_config_ids: Iterable[str]):
+    """Bump ``updated_at`` on grids whose levels changed so cached engines reload.
+
+    EngineRegistry entries are keyed on ``GridConfigs.updated_at``, which the
+    API already reads with the config row. The column has one-second
+    resolution, so only two writes within the same second with a load
+    between them can leave a cached engine stale (until the next write or
+    the registry TTL). Does not commit.
+    """
+    grid_config_ids = list(grid_config_ids)
+    if grid_config_ids:
+        db.query(GridConfigs).filter(GridConfigs.id.in_(grid_config_ids)).update(
+            {GridConfigs.updated_at: func.current_timestamp()}, synchronize_session=False
+        )
+
+def load_active_engines(db: Session) -> Dict[str, GridTradingEngine]:
+    """Rebuild engines for every active grid with two queries in total"""
+    grid_configs = db.query(GridConfigs).filter(GridConfigs.is_active == True).all()
+    
+    grid_levels = db.query(GridLevels).join(
+        GridConfigs, GridLevels.grid_config_id == GridConfigs.id
+    ).filter(
+        GridConfigs.is_active == True
+    ).order_by(GridLevels.grid_config_id, GridLevels.level_number).all()
+    
+    levels_by_grid: Dict[str, List[GridLevels]] = {}
+    for level in grid_levels:
+        levels_by_grid.setdefault(level.grid_config_id, []).append(level)
+    
+    return {
+        grid_config.id: _engine_from_rows(grid_config, levels_by_grid.get(grid_config.id, []))
+        for grid_config in grid_configs
+    }
+
+def save_trigger_prices(db: Session, changes: Dict[str, List[GridLevel]]) -> int:
+    """Diff-update trigger prices of changed levels, keyed by grid_config_id.
+
+    Only the rows for changed levels are touched, written as exact tick
+    Decimals. Does not commit.
+    """
+    changed = {
+        (grid_config_id, level.level_number): price_to_decimal(level.trigger_price)
+        for grid_config_id, levels in changes.items()
+        for level in levels
+    }
+    if not changed:
+        return 0
+    
+    rows = db.query(GridLevels.id, GridLevels.grid_config_id, GridLevels.level_number).filter(
+        GridLevels.grid_config_id.in_(list(changes))
+    ).all()
+    
+    mappings = [
+        {'id': row_id, 'trigger_price': changed[(grid_config_id, level_number)]}
+        for row_id, grid_config_id, level_number in rows
+        if (grid_config_id, level_number) in changed
+    ]
+    db.bulk_update_mappings(GridLevels, mappings)
+    touch_grid_configs(db, {grid_config_id for grid_config_id, _ in changed})
+    return len(mappings)
+
+def save_fill_states(db: Session, transitions: Dict[str, List[LevelTransition]],
+                     triggered_at: Optional[datetime] = None) -> int:
+    """Persist level state transitions keyed by grid_config_id in one bulk update.
+
+    Fills set ``is_filled``, ``filled_price``, ``filled_quantity`` and
+    ``last_triggered``; re-arms only clear ``is_filled``. Does not commit.
+    """
+    triggered_at = triggered_at or datetime.utcnow()
+    # Last transition per level wins if a level appears more than once
+    updates = {}
+    for grid_config_id, grid_transitions in transitions.items():
+        for t in grid_transitions:
+            if t.state == 'filled':
+                updates[(grid_config_id, t.level_number)] = {
+                    'is_filled': True,
+                    'filled_price': price_to_decimal(t.price),
+                    'filled_quantity': t.quantity,
+                    'last_triggered': triggered_at
+                }
+            else:
+                updates[(grid_config_id, t.level_number)] = {'is_filled': False}
+    if not updates:
+        return 0
+    
+    rows = db.query(GridLevels.id, GridLevels.grid_config_id, GridLevels.level_number).filter(
+        GridLevels.grid_config_id.in_(list(transitions))
+    ).all()
+    
+    mappings = [
+        dict(updates[(grid_config_id, level_number)], id=row_id)
+        for row_id, grid_config_id, level_number in rows
+        if (grid_config_id, level_number) in updates
+    ]
+    db.bulk_update_mappings(GridLevels, mappings)
+    touch_grid_configs(db, {grid_config_id for grid_config_id, _ in updates})
+    return len(mappings)
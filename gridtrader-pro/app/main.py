@@ -8,6 +8,7 @@ from dotenv import load_dotenv
 from .database import engine, Base
 from .routers import auth, portfolios, market_data, grids, analytics
 from .data_provider import YFinanceDataProvider
+from .algorithms.worker_pool import shutdown_worker_pool
 
 load_dotenv()
 
@@ -42,6 +43,10 @@ app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytic
 # Initialize data provider
 data_provider = YFinanceDataProvider()
 
+@app.on_event("shutdown")
+def stop_worker_pool():
+    shutdown_worker_pool()
+
 @app.get("/")
 async def root():
     return {"message": "GridTrader Pro API", "version": "1.0.0"}
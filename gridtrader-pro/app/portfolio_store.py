@@ -0,0 +1,48 @@
+from sqlalchemy.orm import Session
+import threading
+import time
+
+from .models import Portfolios, Positions, Securities
+from .algorithms.rebalance_batch import BatchRebalancer
+from .algorithms.sector_allocation import SectorMap
+
+# Securities.sector changes rarely, so the map is shared process-wide and reloaded after this many seconds
+SECTOR_MAP_TTL = 3600
+_sector_map_cache = {'map': None, 'loaded_at': 0.0}
+_sector_map_lock = threading.Lock()
+
+def load_rebalancer(db: Session) -> BatchRebalancer:
+    """Band-check inputs for every active portfolio with two queries in total.
+
+    Targets come from ``Portfolios.target_allocation`` with the default band,
+    as in the single-portfolio rebalance endpoint.
+    """
+    portfolios = db.query(
+        Portfolios.id, Portfolios.total_value, Portfolios.target_allocation
+    ).filter(Portfolios.is_active == True).all()
+    
+    positions = db.query(
+        Positions.portfolio_id, Positions.symbol, Positions.market_value
+    ).join(
+        Portfolios, Positions.portfolio_id == Portfolios.id
+    ).filter(Portfolios.is_active == True).all()
+    
+    return BatchRebalancer.from_records(
+        [(pid, symbol, float(value or 0)) for pid, symbol, value in positions],
+        [(pid, symbol, target_pct, None)
+         for pid, _, target_allocation in portfolios
+         for symbol, target_pct in (target_allocation or {}).items()],
+        {pid: float(total_value or 0) for pid, total_value, _ in portfolios}
+    )
+
+def load_sector_map(db: Session, max_age: float = SECTOR_MAP_TTL) -> SectorMap:
+    """Security -> sector map built from one Securities query and cached for ``max_age`` seconds"""
+    with _sector_map_lock:
+        cached = _sector_map_cache['map']
+        if cached is not None and time.monotonic() - _sector_map_cache['loaded_at'] < max_age:
+            return cached
+        
+        sector_map = SectorMap.from_pairs(db.query(Securities.symbol, Securities.sector).all())
+        _sector_map_cache['map'] = sector_map
+        _sector_map_cache['loaded_at'] = time.monotonic()
+        return sector_map
@@ -0,0 +1,84 @@
+from datetime import date
+from typing import Optional, List, Dict, Tuple
+from sqlalchemy.orm import Session
+import numpy as np
+
+from .models import PriceData
+from .algorithms.grid_backtest import OHLCSeries
+
+def load_ohlc(db: Session, symbol: str, start_date: Optional[date] = None,
+              end_date: Optional[date] = None) -> OHLCSeries:
+    """Load a symbol's daily bars from PriceData as contiguous arrays.
+
+    Missing open/high/low values fall back to the close.
+    """
+    query = db.query(
+        PriceData.date,
+        PriceData.open_price,
+        PriceData.high_price,
+        PriceData.low_price,
+        PriceData.close_price
+    ).filter(PriceData.symbol == symbol.upper())
+    
+    if start_date:
+        query = query.filter(PriceData.date >= start_date)
+    if end_date:
+        query = query.filter(PriceData.date <= end_date)
+    
+    rows = query.order_by(PriceData.date).all()
+    
+    dates = np.array([r[0] for r in rows], dtype='datetime64[D]')
+    values = np.array([[np.nan if v is None else float(v) for v in r[1:]] for r in rows], dtype=float).reshape(-1, 4)
+    close = values[:, 3]
+    
+    return OHLCSeries(
+        dates=dates,
+        open=np.where(np.isnan(values[:, 0]), close, values[:, 0]),
+        high=np.where(np.isnan(values[:, 1]), close, values[:, 1]),
+        low=np.where(np.isnan(values[:, 2]), close, values[:, 2]),
+        close=close
+    )
+
+def load_ohlc_matrix(db: Session, symbols: List[str], start_date: Optional[date] = None,
+                     end_date: Optional[date] = None) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+    """Load several symbols' bars in one query as (symbols, dates) matrices.
+
+    Returns (symbols, dates, fields) where ``fields`` maps 'open', 'high',
+    'low' and 'close' to matrices with NaN for missing bars.
+    """
+    symbols = sorted({s.upper() for s in symbols})
+    query = db.query(
+        PriceData.symbol,
+        PriceData.date,
+        PriceData.open_price,
+        PriceData.high_price,
+        PriceData.low_price,
+        PriceData.close_price
+    ).filter(PriceData.symbol.in_(symbols))
+    
+    if start_date:
+        query = query.filter(PriceData.date >= start_date)
+    if end_date:
+        query = query.filter(PriceData.date <= end_date)
+    
+    rows = query.all()
+    
+    row_symbols = np.array([r[0] for r in rows], dtype=object)
+    row_dates = np.array([r[1] for r in rows], dtype='datetime64[D]')
+    values = np.array([[np.nan if v is None else float(v) for v in r[2:]] for r in rows], dtype=float).reshape(-1, 4)
+    
+    dates = np.unique(row_dates)
+    symbol_idx = np.searchsorted(np.array(symbols, dtype=object), row_symbols) if rows else np.zeros(0, dtype=np.intp)
+    date_idx = np.searchsorted(dates, row_dates)
+    
+    fields = {}
+    for col, name in enumerate(('open', 'high', 'low', 'close')):
+        matrix = np.full((len(symbols), len(dates)), np.nan)
+        matrix[symbol_idx, date_idx] = values[:, col]
+        fields[name] = matrix
+    
+    # Missing open/high/low fall back to the close, as in load_ohlc
+    for name in ('open', 'high', 'low'):
+        fields[name] = np.where(np.isnan(fields[name]), fields['close'], fields[name])
+    
+    return np.array(symbols, dtype=object), dates, fields
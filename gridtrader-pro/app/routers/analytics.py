@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import date, datetime, timedelta
 
 from ..database import get_db
-from ..models import Users, Portfolios, Positions, PriceData
+from ..models import Users, Portfolios, Positions, PriceData, AllocationTargets
 from ..middleware.auth import get_current_user
 from ..algorithms.portfolio_rebalancing import PortfolioRebalancer, Portfolio
+from ..algorithms.rebalance_solver import TradingCosts, REBALANCE_MODES
+from ..algorithms.sector_allocation import HierarchicalRebalancer, SectorTarget
+from ..algorithms.rebalance_backtest import compare_policies
+from ..portfolio_store import load_sector_map
+from ..price_history import load_ohlc_matrix
+import numpy as np
 
 router = APIRouter()
 
@@ -126,10 +132,23 @@ async def get_portfolio_allocation(
 @router.get("/{portfolio_id}/rebalance")
 async def get_rebalance_recommendations(
     portfolio_id: str,
+    mode: str = "target",
+    fee_rate: float = Query(0.0, ge=0, lt=1),
+    spread: float = Query(0.0, ge=0, lt=1),
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get portfolio rebalancing recommendations"""
+    """Get portfolio rebalancing recommendations.
+
+    ``mode=band_edge`` trades only back to the band edges within the
+    AllocationTargets min/max percentages, minimizing turnover plus fees and spread.
+    """
+    
+    if mode not in REBALANCE_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown rebalance mode: {mode}. Expected one of {', '.join(REBALANCE_MODES)}"
+        )
     
     # Verify portfolio ownership
     portfolio_db = db.query(Portfolios).filter(
@@ -162,16 +181,32 @@ async def get_rebalance_recommendations(
             "recommendations": []
         }
     
+    min_percentages, max_percentages = {}, {}
+    if mode == "band_edge":
+        # Per-symbol bands and limits from AllocationTargets override the defaults
+        for target in db.query(AllocationTargets).filter(
+            AllocationTargets.portfolio_id == portfolio_id,
+            AllocationTargets.symbol.isnot(None)
+        ).all():
+            if target.rebalance_band is not None:
+                rebalance_bands[target.symbol] = float(target.rebalance_band)
+            if target.min_percentage is not None:
+                min_percentages[target.symbol] = float(target.min_percentage)
+            if target.max_percentage is not None:
+                max_percentages[target.symbol] = float(target.max_percentage)
+    
     # Create portfolio object for rebalancer
     portfolio_obj = Portfolio(
         total_value=total_value,
         positions=current_positions,
         allocation_targets=target_allocation,
-        rebalance_bands=rebalance_bands
+        rebalance_bands=rebalance_bands,
+        min_percentages=min_percentages,
+        max_percentages=max_percentages
     )
     
     rebalancer = PortfolioRebalancer(portfolio_obj)
-    actions = rebalancer.calculate_rebalance_actions()
+    actions = rebalancer.calculate_rebalance_actions(mode, TradingCosts(fee_rate=fee_rate, spread=spread))
     metrics = rebalancer.calculate_portfolio_metrics()
     
     return {
@@ -186,10 +221,170 @@ async def get_rebalance_recommendations(
             }
             for action in actions
         ],
+        "mode": mode,
+        "netted_turnover": rebalancer.netted_turnover,
+        "estimated_costs": rebalancer.estimated_costs,
         "portfolio_metrics": metrics,
         "needs_rebalancing": len(actions) > 0
     }
 
+@router.get("/{portfolio_id}/rebalance/sectors")
+async def get_sector_rebalance_recommendations(
+    portfolio_id: str,
+    current_user: Users = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get hierarchical rebalancing recommendations: sector budgets first, then symbols"""
+    
+    # Verify portfolio ownership
+    portfolio_db = db.query(Portfolios).filter(
+        Portfolios.id == portfolio_id,
+        Portfolios.user_id == current_user.id
+    ).first()
+    
+    if not portfolio_db:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Portfolio not found"
+        )
+    
+    positions = db.query(Positions).filter(
+        Positions.portfolio_id == portfolio_id
+    ).all()
+    allocation_targets = db.query(AllocationTargets).filter(
+        AllocationTargets.portfolio_id == portfolio_id
+    ).all()
+    
+    # Rows with a symbol are symbol targets; rows with only a sector name are sector budgets
+    symbol_targets = {t.symbol: float(t.target_percentage) for t in allocation_targets if t.symbol}
+    symbol_bands = {
+        t.symbol: float(t.rebalance_band) if t.rebalance_band is not None else 5.0
+        for t in allocation_targets if t.symbol
+    }
+    sector_targets = {
+        t.sector_name: SectorTarget(
+            target_percentage=float(t.target_percentage),
+            rebalance_band=float(t.rebalance_band) if t.rebalance_band is not None else 5.0
+        )
+        for t in allocation_targets if not t.symbol and t.sector_name
+    }
+    
+    if not symbol_targets:
+        symbol_targets = portfolio_db.target_allocation or {}
+    
+    if not symbol_targets and not sector_targets:
+        return {
+            "portfolio_id": portfolio_id,
+            "message": "No target allocation configured",
+            "recommendations": []
+        }
+    
+    portfolio_obj = Portfolio(
+        total_value=float(portfolio_db.total_value),
+        positions={pos.symbol: float(pos.market_value) for pos in positions},
+        allocation_targets=symbol_targets,
+        rebalance_bands=symbol_bands
+    )
+    
+    rebalancer = HierarchicalRebalancer(portfolio_obj, load_sector_map(db), sector_targets)
+    actions = rebalancer.calculate_rebalance_actions()
+    
+    return {
+        "portfolio_id": portfolio_id,
+        "total_value": portfolio_obj.total_value,
+        "sector_allocations": rebalancer.sector_allocations(),
+        "rebalance_actions": [
+            {
+                "symbol": action.symbol,
+                "action": action.action,
+                "value": action.value,
+                "reason": action.reason
+            }
+            for action in actions
+        ],
+        "needs_rebalancing": len(actions) > 0
+    }
+
+@router.get("/{portfolio_id}/rebalance/backtest")
+async def backtest_rebalance_policies(
+    portfolio_id: str,
+    band_widths: List[float] = Query([2.5, 5.0, 10.0]),
+    frequency: int = Query(21, ge=1, le=252),
+    cost_rate: float = Query(0.0, ge=0, lt=1),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: Users = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Backtest calendar, band and hybrid rebalancing of the target allocation on stored prices"""
+    
+    # Verify portfolio ownership
+    portfolio_db = db.query(Portfolios).filter(
+        Portfolios.id == portfolio_id,
+        Portfolios.user_id == current_user.id
+    ).first()
+    
+    if not portfolio_db:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Portfolio not found"
+        )
+    
+    target_allocation = {s.upper(): float(p) for s, p in (portfolio_db.target_allocation or {}).items()}
+    if not target_allocation:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No target allocation configured"
+        )
+    
+    symbols, dates, fields = load_ohlc_matrix(db, list(target_allocation), start_date, end_date)
+    missing = [s for s, row in zip(symbols.tolist(), fields['close']) if np.isnan(row).all()]
+    if missing or len(dates) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Not enough price data for {', '.join(missing) or 'the target allocation'}"
+        )
+    
+    # Dates before every symbol has a price are skipped by the backtest
+    first_complete = int((~np.isnan(fields['close'])).argmax(axis=1).max())
+    
+    # Per-symbol bands configured in AllocationTargets get one extra band and hybrid run
+    configured_bands = {
+        t.symbol.upper(): float(t.rebalance_band)
+        for t in db.query(AllocationTargets).filter(
+            AllocationTargets.portfolio_id == portfolio_id,
+            AllocationTargets.symbol.isnot(None)
+        ).all()
+        if t.rebalance_band is not None
+    }
+    bands = np.array([configured_bands.get(s, 5.0) for s in symbols.tolist()]) if configured_bands else None
+    
+    try:
+        results = compare_policies(
+            fields['close'],
+            [target_allocation[s] for s in symbols.tolist()],
+            band_widths,
+            frequency,
+            cost_rate,
+            bands
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return {
+        "portfolio_id": portfolio_id,
+        "period": {
+            "start": str(dates[first_complete]),
+            "end": str(dates[-1])
+        },
+        "frequency": frequency,
+        "cost_rate": cost_rate,
+        "results": results
+    }
+
 @router.get("/{portfolio_id}/risk")
 async def get_risk_metrics(
     portfolio_id: str,
@@ -1,14 +1,257 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import date
+import numpy as np
 
 from ..database import get_db
 from ..models import Users, Portfolios, GridConfigs, GridLevels
 from ..middleware.auth import get_current_user
-from ..algorithms.grid_trading import GridTradingEngine, GridConfig
+from ..algorithms.grid_trading import GridTradingEngine, GridConfig, GRID_TYPES, price_to_decimal
+from ..algorithms.grid_backtest import backtest_grid
+from ..algorithms.grid_optimizer import parameter_grid, sweep_grid_parameters, MAX_SWEEP_CONFIGS
+from ..algorithms.grid_registry import engine_registry
+from ..algorithms.monte_carlo import simulate_grid, SIMULATION_MODELS
+from ..algorithms.walk_forward import walk_forward
+from ..algorithms.worker_pool import get_worker_pool
+from ..price_history import load_ohlc
+from ..grid_store import load_engine
 
 router = APIRouter()
 
+# Levels per side allowed in backtests, sweeps and simulations; lot_states memory
+# grows with levels x price points
+MAX_GRID_LEVELS = 200
+
+# The backtest, optimize, walk-forward and simulate endpoints are CPU-bound, so they are
+# plain ``def`` handlers: FastAPI runs them in its threadpool instead of on the event loop.
+
+def _validate_grid_type(grid_type: str):
+    if grid_type not in GRID_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported grid type. Use one of: {', '.join(GRID_TYPES)}"
+        )
+
+def _validate_level_counts(*counts: List[int]):
+    if any(n < 0 or n > MAX_GRID_LEVELS for values in counts for n in values):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Grid level counts must be between 0 and {MAX_GRID_LEVELS}"
+        )
+
+def _validate_sweep_size(*param_lists: List):
+    combinations = int(np.prod([len(p) for p in param_lists]))
+    if combinations > MAX_SWEEP_CONFIGS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many parameter combinations ({combinations}); the limit is {MAX_SWEEP_CONFIGS}"
+        )
+
+@router.get("/backtest/{symbol}")
+def backtest_grid_config(
+    symbol: str,
+    base_price: float,
+    grid_spacing: float,
+    num_grids_up: int = Query(..., ge=0, le=MAX_GRID_LEVELS),
+    num_grids_down: int = Query(..., ge=0, le=MAX_GRID_LEVELS),
+    position_size: float = Query(...),
+    grid_type: str = "percentage",
+    initial_cash: Optional[float] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: Users = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Backtest a grid configuration against stored price history"""
+    
+    _validate_grid_type(grid_type)
+    prices = load_ohlc(db, symbol, start_date, end_date)
+    
+    if len(prices) == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No price data found for symbol"
+        )
+    
+    config = GridConfig(
+        symbol=symbol.upper(),
+        base_price=base_price,
+        grid_spacing=grid_spacing,
+        num_grids_up=num_grids_up,
+        num_grids_down=num_grids_down,
+        position_size=position_size,
+        grid_type=grid_type
+    )
+    
+    result = backtest_grid(config, prices, initial_cash)
+    
+    return {
+        "symbol": symbol.upper(),
+        "period": {
+            "start_date": str(prices.dates[0]),
+            "end_date": str(prices.dates[-1])
+        },
+        "summary": result.summary(),
+        "equity_curve": result.equity.tolist()
+    }
+
+@router.get("/optimize/{symbol}")
+def optimize_grid_config(
+    symbol: str,
+    base_price: float,
+    grid_spacing: List[float] = Query(...),
+    num_grids_up: List[int] = Query(...),
+    num_grids_down: List[int] = Query(...),
+    position_size: List[float] = Query(...),
+    grid_type: str = "percentage",
+    rank_by: str = "total_return_pct",
+    top_n: int = Query(20, le=500),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: Users = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Backtest every combination of grid parameters and rank the results"""
+    
+    _validate_grid_type(grid_type)
+    prices = load_ohlc(db, symbol, start_date, end_date)
+    
+    if len(prices) == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No price data found for symbol"
+        )
+    
+    _validate_level_counts(num_grids_up, num_grids_down)
+    _validate_sweep_size(grid_spacing, num_grids_up, num_grids_down, position_size)
+    configs = parameter_grid(
+        symbol.upper(), base_price, grid_spacing, num_grids_up, num_grids_down, position_size, grid_type
+    )
+    results = sweep_grid_parameters(configs, prices, rank_by=rank_by, executor=get_worker_pool())
+    
+    return {
+        "symbol": symbol.upper(),
+        "combinations": len(configs),
+        "results": results[:top_n]
+    }
+
+@router.get("/walk-forward/{symbol}")
+def walk_forward_grid_config(
+    symbol: str,
+    grid_spacing: List[float] = Query(...),
+    num_grids_up: List[int] = Query(...),
+    num_grids_down: List[int] = Query(...),
+    position_size: List[float] = Query(...),
+    grid_type: str = "percentage",
+    rank_by: str = "total_return_pct",
+    in_sample_bars: int = Query(252, ge=20),
+    out_of_sample_bars: int = Query(63, ge=5),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: Users = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Walk-forward validation: optimize on rolling in-sample windows, test out of sample"""
+    
+    _validate_grid_type(grid_type)
+    _validate_level_counts(num_grids_up, num_grids_down)
+    _validate_sweep_size(grid_spacing, num_grids_up, num_grids_down, position_size)
+    prices = load_ohlc(db, symbol, start_date, end_date)
+    
+    if len(prices) <= in_sample_bars:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not enough price data for the in-sample window"
+        )
+    
+    result = walk_forward(
+        prices,
+        symbol.upper(),
+        grid_spacing,
+        num_grids_up,
+        num_grids_down,
+        position_size,
+        in_sample_bars=in_sample_bars,
+        out_of_sample_bars=out_of_sample_bars,
+        grid_type=grid_type,
+        rank_by=rank_by,
+        executor=get_worker_pool()
+    )
+    
+    return {
+        "symbol": symbol.upper(),
+        "summary": result.summary(),
+        "stitched_equity": result.stitched_equity.tolist()
+    }
+
+@router.get("/simulate/{symbol}")
+def simulate_grid_config(
+    symbol: str,
+    base_price: float,
+    grid_spacing: float,
+    num_grids_up: int = Query(..., ge=0, le=MAX_GRID_LEVELS),
+    num_grids_down: int = Query(..., ge=0, le=MAX_GRID_LEVELS),
+    position_size: float = Query(...),
+    grid_type: str = "percentage",
+    model: str = "bootstrap",
+    n_paths: int = Query(5000, ge=1, le=100000),
+    n_steps: int = Query(252, ge=1, le=2520),
+    sigma: Optional[float] = None,
+    block_size: int = Query(5, ge=1),
+    ruin_drawdown: float = 0.5,
+    seed: Optional[int] = None,
+    current_user: Users = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Monte Carlo risk profile of a grid over GBM or bootstrapped price paths"""
+    
+    _validate_grid_type(grid_type)
+    if model not in SIMULATION_MODELS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported model. Use one of: {', '.join(SIMULATION_MODELS)}"
+        )
+    
+    prices = load_ohlc(db, symbol)
+    close = prices.close[prices.close > 0]
+    returns = np.diff(np.log(close))
+    
+    if len(returns) < 2 and (model == "bootstrap" or sigma is None):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not enough price data found for symbol"
+        )
+    
+    config = GridConfig(
+        symbol=symbol.upper(),
+        base_price=base_price,
+        grid_spacing=grid_spacing,
+        num_grids_up=num_grids_up,
+        num_grids_down=num_grids_down,
+        position_size=position_size,
+        grid_type=grid_type
+    )
+    
+    result = simulate_grid(
+        config,
+        n_paths=n_paths,
+        n_steps=n_steps,
+        model=model,
+        sigma=sigma if sigma is not None else float(returns.std(ddof=1)),
+        returns=returns,
+        block_size=block_size,
+        seed=seed,
+        executor=get_worker_pool()
+    )
+    
+    return {
+        "symbol": symbol.upper(),
+        "model": model,
+        "steps": n_steps,
+        "summary": result.summary(ruin_drawdown)
+    }
+
 @router.get("/{portfolio_id}")
 async def get_grid_configs(
     portfolio_id: str,
@@ -51,6 +294,8 @@ async def create_grid_config(
 ):
     """Create new grid configuration"""
     
+    _validate_grid_type(grid_type)
+    
     # Verify portfolio ownership
     portfolio = db.query(Portfolios).filter(
         Portfolios.id == portfolio_id,
@@ -90,14 +335,14 @@ async def create_grid_config(
         grid_type=grid_type
     )
     
-    engine = GridTradingEngine(config)
+    engine = GridTradingEngine(config, compact=True)
     
     # Create grid levels in database
     for level in engine.levels:
         grid_level = GridLevels(
             grid_config_id=grid_config.id,
             level_number=level.level_number,
-            trigger_price=level.trigger_price,
+            trigger_price=price_to_decimal(level.trigger_price),
             target_allocation=level.target_allocation
         )
         db.add(grid_level)
@@ -105,6 +350,8 @@ async def create_grid_config(
     db.commit()
     db.refresh(grid_config)
     
+    engine_registry.put(grid_config.id, engine, grid_config.updated_at)
+    
     return {"grid_config_id": grid_config.id}
 
 @router.get("/{portfolio_id}/{grid_config_id}/levels")
@@ -148,6 +395,101 @@ async def get_grid_levels(
         "grid_levels": grid_levels
     }
 
+@router.get("/{portfolio_id}/{grid_config_id}/stats")
+async def get_grid_stats(
+    portfolio_id: str,
+    grid_config_id: str,
+    current_user: Users = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get fill statistics for a grid from its cached engine"""
+    
+    # Verify portfolio ownership
+    portfolio = db.query(Portfolios).filter(
+        Portfolios.id == portfolio_id,
+        Portfolios.user_id == current_user.id
+    ).first()
+    
+    if not portfolio:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Portfolio not found"
+        )
+    
+    grid_config = db.query(GridConfigs).filter(
+        GridConfigs.id == grid_config_id,
+        GridConfigs.portfolio_id == portfolio_id
+    ).first()
+    
+    if not grid_config:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Grid configuration not found"
+        )
+    
+    # Celery tasks bump updated_at when they write fills or respaced prices
+    engine = engine_registry.get_or_load(
+        grid_config_id, lambda: load_engine(db, grid_config), grid_config.updated_at
+    )
+    
+    return {
+        "grid_config_id": grid_config_id,
+        "statistics": engine.get_grid_statistics()
+    }
+
+@router.get("/{portfolio_id}/{grid_config_id}/triggers")
+async def check_grid_triggers(
+    portfolio_id: str,
+    grid_config_id: str,
+    price: float,
+    current_user: Users = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Check which grid levels a price would trigger, using the cached engine"""
+    
+    # Verify portfolio ownership
+    portfolio = db.query(Portfolios).filter(
+        Portfolios.id == portfolio_id,
+        Portfolios.user_id == current_user.id
+    ).first()
+    
+    if not portfolio:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Portfolio not found"
+        )
+    
+    grid_config = db.query(GridConfigs).filter(
+        GridConfigs.id == grid_config_id,
+        GridConfigs.portfolio_id == portfolio_id
+    ).first()
+    
+    if not grid_config:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Grid configuration not found"
+        )
+    
+    # Celery tasks bump updated_at when they write fills or respaced prices
+    engine = engine_registry.get_or_load(
+        grid_config_id, lambda: load_engine(db, grid_config), grid_config.updated_at
+    )
+    actions = engine.check_triggers(price)
+    
+    return {
+        "grid_config_id": grid_config_id,
+        "price": price,
+        "actions": [
+            {
+                "level_id": action.level_id,
+                "action": action.action,
+                "quantity": action.quantity,
+                "price": action.price
+            }
+            for action in actions
+        ]
+    }
+
 @router.delete("/{portfolio_id}/{grid_config_id}")
 async def delete_grid_config(
     portfolio_id: str,
@@ -186,5 +528,6 @@ async def delete_grid_config(
     # Delete grid configuration
     db.delete(grid_config)
     db.commit()
+    engine_registry.invalidate(grid_config_id)
     
     return {"message": "Grid configuration deleted successfully"}
@@ -2,6 +2,15 @@ from celery import Celery
 from .data_provider import YFinanceDataProvider
 from .database import SessionLocal
 from .models import Securities, RealTimePrices
+from .algorithms.grid_batch import BatchGridEvaluator
+from .algorithms.grid_trading import coalesce_actions
+from .algorithms.drift_index import DriftIndex
+from .algorithms.volatility import rolling_volatility, average_true_range, latest_valid
+from .price_history import load_ohlc_matrix
+from .grid_store import load_active_engines, save_trigger_prices, save_fill_states
+from .portfolio_store import load_rebalancer
+from datetime import date, datetime, timedelta
+import numpy as np
 import asyncio
 import os
 
@@ -67,6 +76,153 @@ def update_daily_price_data():
     
     asyncio.run(_update())
 
+@celery_app.task
+def evaluate_grid_triggers():
+    """Advance the fill state of all active grids against the latest real-time prices in one pass.
+
+    Only level transitions are persisted, so levels that stay past their
+    trigger are not re-emitted on every run.
+    """
+    db = SessionLocal()
+    try:
+        evaluator = BatchGridEvaluator()
+        for grid_config_id, engine in load_active_engines(db).items():
+            evaluator.add_engine(grid_config_id, engine)
+        evaluator.build()
+        
+        prices = {
+            p.symbol: p.current_price
+            for p in db.query(RealTimePrices).filter(RealTimePrices.symbol.in_(evaluator.symbols)).all()
+        }
+        
+        transitions = evaluator.transitions(prices)
+        orders = {
+            grid_id: coalesce_actions([t.to_action() for t in grid_transitions if t.state == 'filled'])
+            for grid_id, grid_transitions in transitions.items()
+        }
+        
+        updated = save_fill_states(db, transitions)
+        db.commit()
+        
+        total_orders = sum(len(o) for o in orders.values())
+        total_levels = sum(len(order.level_ids) for grid_orders in orders.values() for order in grid_orders)
+        print(f"Evaluated {len(evaluator.grid_ids)} grids: {total_orders} orders covering {total_levels} levels "
+              f"({updated} level states updated)")
+        return total_orders
+        
+    except Exception as e:
+        db.rollback()
+        print(f"Error evaluating grid triggers: {e}")
+    finally:
+        db.close()
+
+@celery_app.task
+def update_volatility_spacing(window: int = 20, source: str = "realized"):
+    """Respace active grids from rolling realized volatility or ATR computed for all symbols at once"""
+    db = SessionLocal()
+    try:
+        engines = load_active_engines(db)
+        if not engines:
+            return 0
+        
+        symbols = {engine.config.symbol for engine in engines.values()}
+        # Calendar-day buffer so the window is covered despite weekends and holidays
+        start_date = date.today() - timedelta(days=window * 3)
+        symbol_list, dates, bars = load_ohlc_matrix(db, symbols, start_date)
+        
+        if source == "atr":
+            with np.errstate(divide='ignore', invalid='ignore'):
+                volatility = latest_valid(
+                    average_true_range(bars['high'], bars['low'], bars['close'], window) / bars['close']
+                )
+        else:
+            volatility = latest_valid(rolling_volatility(bars['close'], window))
+        
+        volatility_by_symbol = dict(zip(symbol_list.tolist(), volatility.tolist()))
+        
+        changes = {}
+        for grid_config_id, engine in engines.items():
+            symbol_volatility = volatility_by_symbol.get(engine.config.symbol.upper())
+            if symbol_volatility is None or np.isnan(symbol_volatility):
+                continue
+            
+            changed = engine.update_grid_spacing(symbol_volatility)
+            if changed:
+                changes[grid_config_id] = changed
+        
+        updated = save_trigger_prices(db, changes)
+        db.commit()
+        print(f"Respaced {len(changes)} of {len(engines)} grids ({updated} levels updated)")
+        return updated
+        
+    except Exception as e:
+        db.rollback()
+        print(f"Error updating volatility spacing: {e}")
+    finally:
+        db.close()
+
+@celery_app.task
+def check_portfolio_rebalancing():
+    """Band-check every active portfolio at once and report those that need rebalancing"""
+    db = SessionLocal()
+    try:
+        result = load_rebalancer(db).calculate()
+        needs_rebalancing = result.needs_rebalancing
+        
+        print(f"Rebalance check: {int(needs_rebalancing.sum())} of {len(result.portfolio_ids)} portfolios "
+              f"outside their bands ({int(result.breaches.sum())} holdings)")
+        return [pid for pid, flag in zip(result.portfolio_ids, needs_rebalancing.tolist()) if flag]
+        
+    except Exception as e:
+        print(f"Error checking portfolio rebalancing: {e}")
+    finally:
+        db.close()
+
+# Process-local drift index, rebuilt from the database every DRIFT_INDEX_TTL seconds
+DRIFT_INDEX_TTL = 3600
+_drift_state = {'index': None, 'built_at': None, 'watermark': None}
+
+@celery_app.task
+def monitor_portfolio_drift():
+    """Check only the portfolios whose bands the latest price updates could have breached.
+
+    Reports every portfolio outside its bands at the latest prices; the
+    hourly rebuild only re-centres the index to keep the candidate set small.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        state = _drift_state
+        
+        if state['index'] is None or (now - state['built_at']).total_seconds() > DRIFT_INDEX_TTL:
+            rebalancer = load_rebalancer(db)
+            rows = db.query(RealTimePrices).filter(RealTimePrices.symbol.in_(rebalancer.symbols)).all()
+            prices = {p.symbol: p.current_price for p in rows}
+            state['index'] = DriftIndex(rebalancer, prices)
+            state['built_at'] = now
+            state['watermark'] = max((p.last_updated for p in rows if p.last_updated), default=None)
+            breached = [pid for pid, flag in zip(rebalancer.portfolio_ids,
+                                                 rebalancer.calculate().needs_rebalancing.tolist()) if flag]
+            print(f"Built drift index for {len(rebalancer.portfolio_ids)} portfolios: {len(breached)} outside their bands")
+            return breached
+        
+        query = db.query(RealTimePrices).filter(RealTimePrices.symbol.in_(state['index'].symbols))
+        if state['watermark'] is not None:
+            query = query.filter(RealTimePrices.last_updated > state['watermark'])
+        rows = query.all()
+        if not rows:
+            return []
+        
+        state['watermark'] = max((p.last_updated for p in rows if p.last_updated), default=state['watermark'])
+        breached = state['index'].update({p.symbol: p.current_price for p in rows})
+        print(f"Drift check: {len(rows)} price updates, {len(breached)} portfolios outside their bands")
+        return breached
+        
+    except Exception as e:
+        print(f"Error monitoring portfolio drift: {e}")
+    finally:
+        db.close()
+
 # Schedule tasks
 celery_app.conf.beat_schedule = {
     'update-real-time-prices': {
@@ -77,6 +233,22 @@ celery_app.conf.beat_schedule = {
         'task': 'tasks.update_daily_price_data',
         'schedule': 3600.0,  # Every hour
     },
+    'evaluate-grid-triggers': {
+        'task': 'tasks.evaluate_grid_triggers',
+        'schedule': 300.0,  # Every 5 minutes, after the price refresh
+    },
+    'update-volatility-spacing': {
+        'task': 'tasks.update_volatility_spacing',
+        'schedule': 3600.0,  # Every hour, with the daily price data
+    },
+    'monitor-portfolio-drift': {
+        'task': 'tasks.monitor_portfolio_drift',
+        'schedule': 300.0,  # Every 5 minutes, after the price refresh
+    },
+    'check-portfolio-rebalancing': {
+        'task': 'tasks.check_portfolio_rebalancing',
+        'schedule': 86400.0,  # Nightly
+    },
 }
 
 celery_app.conf.timezone = 'UTC'
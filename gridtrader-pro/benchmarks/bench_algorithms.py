@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for app/algorithms with synthetic data.
+
+Results are written as JSON so runs can be compared across commits:
+
+    python benchmarks/bench_algorithms.py --output bench.json
+    python benchmarks/bench_algorithms.py --compare bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.algorithms.grid_trading import GridConfig, GridTradingEngine
+from app.algorithms.portfolio_rebalancing import Portfolio, PortfolioRebalancer, RebalanceAction
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+SEED = 42
+
+def _grid_config(size: int) -> GridConfig:
+    # size is the total number of levels, split evenly around the base price
+    return GridConfig(
+        symbol="BENCH",
+        base_price=100.0,
+        grid_spacing=50.0 / max(size, 1),
+        num_grids_up=size // 2,
+        num_grids_down=size - size // 2,
+        position_size=100.0
+    )
+
+def _portfolio(size: int, rng: np.random.Generator) -> Portfolio:
+    symbols = [f"S{i:06d}" for i in range(size)]
+    values = rng.uniform(0.5, 1.5, size) * 1000
+    return Portfolio(
+        total_value=float(values.sum()),
+        positions=dict(zip(symbols, values.tolist())),
+        allocation_targets={s: 100.0 / size for s in symbols},
+        # Bands at a quarter of each target weight leave about half the holdings out of band
+        rebalance_bands={s: 25.0 / size for s in symbols}
+    )
+
+def _rebalance_actions(size: int, rng: np.random.Generator):
+    values = rng.uniform(10, 1000, size).tolist()
+    return [
+        RebalanceAction(
+            symbol=f"S{i:06d}",
+            action='BUY' if i % 2 == 0 else 'SELL',
+            value=value,
+            reason="benchmark"
+        )
+        for i, value in enumerate(values)
+    ]
+
+def bench_generate_levels(size, rng):
+    config = _grid_config(size)
+    return lambda: GridTradingEngine(config)
+
+def bench_generate_levels_compact(size, rng):
+    config = _grid_config(size)
+    return lambda: GridTradingEngine(config, compact=True)
+
+def bench_check_triggers(size, rng):
+    config = _grid_config(size)
+    engine = GridTradingEngine(config)
+    # Ticks within one grid step of the base price, so the lookup dominates
+    step = config.base_price * config.grid_spacing / 100
+    prices = rng.uniform(config.base_price - step, config.base_price + step, 1000).tolist()
+    
+    def run():
+        for price in prices:
+            engine.check_triggers(price)
+    return run
+
+def bench_update_grid_spacing(size, rng):
+    engine = GridTradingEngine(_grid_config(size))
+    volatilities = rng.uniform(0.005, 0.05, 10).tolist()
+    
+    def run():
+        for volatility in volatilities:
+            engine.update_grid_spacing(volatility)
+    return run
+
+def bench_get_grid_statistics(size, rng):
+    engine = GridTradingEngine(_grid_config(size))
+    for level in engine.levels[::3]:
+        engine.set_filled(level.level_number)
+    return engine.get_grid_statistics
+
+def bench_calculate_rebalance_actions(size, rng):
+    rebalancer = PortfolioRebalancer(_portfolio(size, rng))
+    return rebalancer.calculate_rebalance_actions
+
+def bench_optimize_trades(size, rng):
+    rebalancer = PortfolioRebalancer(_portfolio(1, rng))
+    actions = _rebalance_actions(size, rng)
+    
+    def run():
+        rebalancer._optimize_trades(actions)
+    return run
+
+# name -> (setup, largest size to run, operations per call)
+BENCHMARKS = {
+    'generate_levels': (bench_generate_levels, None, 1),
+    'generate_levels_compact': (bench_generate_levels_compact, None, 1),
+    'check_triggers': (bench_check_triggers, None, 1000),
+    'update_grid_spacing': (bench_update_grid_spacing, None, 10),
+    'get_grid_statistics': (bench_get_grid_statistics, None, 1),
+    'calculate_rebalance_actions': (bench_calculate_rebalance_actions, None, 1),
+    'optimize_trades': (bench_optimize_trades, None, 1),
+}
+
+def time_call(fn, repeat: int, min_time: float = 0.05):
+    """Best-of style timing: each sample loops until ``min_time`` has elapsed"""
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        loops = 0
+        start = time.perf_counter()
+        while True:
+            fn()
+            loops += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        samples.append(elapsed / loops)
+    return samples
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+def run_benchmarks(sizes, repeat, selected=None):
+    results = []
+    for name, (setup, max_size, ops) in BENCHMARKS.items():
+        if selected and name not in selected:
+            continue
+        for size in sizes:
+            if max_size is not None and size > max_size:
+                continue
+            
+            rng = np.random.default_rng(SEED)
+            samples = time_call(setup(size, rng), repeat)
+            result = {
+                'benchmark': name,
+                'size': size,
+                'operations_per_call': ops,
+                'repeat': repeat,
+                'min_s': min(samples),
+                'median_s': statistics.median(samples),
+                'mean_s': statistics.mean(samples)
+            }
+            results.append(result)
+            print(f"{name:30s} size={size:>7d}  median={result['median_s'] * 1e3:10.4f} ms")
+    return results
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['benchmark'], r['size']): r for r in json.load(f)['results']}
+    
+    print(f"\nCompared with {baseline_path} (ratio > 1 means slower now):")
+    for result in results:
+        previous = baseline.get((result['benchmark'], result['size']))
+        if previous:
+            ratio = result['median_s'] / previous['median_s']
+            print(f"{result['benchmark']:30s} size={result['size']:>7d}  x{ratio:6.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the algorithms package")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--benchmarks', nargs='+', choices=sorted(BENCHMARKS))
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="JSON file from a previous run to compare against")
+    args = parser.parse_args()
+    
+    results = run_benchmarks(args.sizes, args.repeat, args.benchmarks)
+    
+    report = {
+        'metadata': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'seed': SEED
+        },
+        'results': results
+    }
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {len(results)} results to {args.output}")
+    
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()